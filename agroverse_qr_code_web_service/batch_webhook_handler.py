@@ -11,18 +11,25 @@ import os
 import sys
 import json
 import argparse
+import logging
 import zipfile
 import tempfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 # Add the current directory to Python path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from github_webhook_handler import GitHubWebhookHandler
+from github_webhook_handler import GitHubWebhookHandler, GITHUB_REPOSITORY, GITHUB_UPLOAD_WORKERS
 from digital_signature_processor import DigitalSignatureProcessor
 
+logger = logging.getLogger(__name__)
+
+# Maximum concurrent processes rendering QR code images in a batch
+RENDER_WORKERS = os.cpu_count() or 1
+
 class BatchWebhookHandler:
     def __init__(self, github_token=None):
         """Initialize the batch webhook handler"""
@@ -30,8 +37,12 @@ class BatchWebhookHandler:
         self.handler = GitHubWebhookHandler(github_token=self.github_token)
         self.signature_processor = DigitalSignatureProcessor()
         
-    def process_batch_request(self, start_row, end_row, zip_file_name, digital_signature=None, requestor_email=None):
-        """Process a batch QR code generation request"""
+    def process_batch_request(self, start_row, end_row, zip_file_name, digital_signature=None, requestor_email=None, skip_existing=False):
+        """Process a batch QR code generation request
+
+        Existing PNGs on GitHub are overwritten (so re-runs pick up corrected labels)
+        unless skip_existing is set, in which case only new rows are uploaded.
+        """
         print(f"🔄 Processing batch request: rows {start_row}-{end_row}")
         
         try:
@@ -44,26 +55,45 @@ class BatchWebhookHandler:
             
             print(f"✅ Found {len(sheet_data)} rows to process")
             
+            # With skip_existing, check up front which rows are already published so
+            # re-runs only upload new rows
+            already_uploaded_rows = self.find_already_uploaded_rows(sheet_data) if skip_existing else set()
+            if already_uploaded_rows:
+                print(f"⏭️ {len(already_uploaded_rows)} row(s) already on GitHub, upload will be skipped")
+            
             # Step 2: Generate QR code images for each row
             print("🎨 Step 2: Generating QR code images...")
             generated_images = []
             
-            for row_data in sheet_data:
-                try:
-                    image_path = self.generate_qr_code_image(row_data)
-                    if image_path:
-                        generated_images.append({
-                            'qr_code': row_data['qr_code'],
-                            'image_path': image_path,
-                            'row': row_data['row']
-                        })
-                        print(f"✅ Generated QR code for {row_data['qr_code']}")
-                except Exception as e:
-                    print(f"❌ Failed to generate QR code for row {row_data['row']}: {e}")
+            # QR encoding is CPU-bound pure Python, so render rows in separate processes;
+            # each worker builds its own handler once and only the row dicts are pickled
+            with ProcessPoolExecutor(
+                max_workers=max(1, min(RENDER_WORKERS, len(sheet_data))),
+                initializer=_init_render_worker,
+                initargs=(self.github_token,),
+            ) as executor:
+                image_paths = list(executor.map(render_one, sheet_data))
+            
+            for row_data, image_path in zip(sheet_data, image_paths):
+                if image_path:
+                    generated_images.append({
+                        'qr_code': row_data['qr_code'],
+                        'image_path': image_path,
+                        'row': row_data['row'],
+                        'row_data': row_data,
+                        'already_uploaded': row_data['row'] in already_uploaded_rows
+                    })
+                    print(f"✅ Generated QR code for {row_data['qr_code']}")
+                else:
+                    print(f"❌ Failed to generate QR code for row {row_data['row']}")
             
             if not generated_images:
                 raise Exception("No QR code images were generated successfully")
             
+            # Commit all generated images at once (one commit per target repository)
+            print("☁️ Step 2b: Committing QR code images to GitHub...")
+            self.upload_generated_images(generated_images)
+            
             # Step 3: Create zip file
             print("📦 Step 3: Creating zip file...")
             zip_file_path = self.create_zip_file(generated_images, zip_file_name)
@@ -141,9 +171,8 @@ class BatchWebhookHandler:
             sheet_data = []
             for i, row in enumerate(rows):
                 if len(row) >= 9:  # Ensure we have minimum required columns
-                    print(f"🔍 DEBUG: Raw row {start_row + i}: {row}")
-                    print(f"🔍 DEBUG: Column A (QR code): '{row[0] if len(row) > 0 else 'EMPTY'}'")
-                    print(f"🔍 DEBUG: Column K (GitHub URL): '{row[10] if len(row) > 10 else 'EMPTY'}'")
+                    logger.debug("Raw row %s: %s", start_row + i, row)
+                    logger.debug("Column K (GitHub URL): %r", row[10] if len(row) > 10 else 'EMPTY')
                     
                     sheet_data.append({
                         'row': start_row + i,
@@ -165,7 +194,7 @@ class BatchWebhookHandler:
                         'requestor_email': row[23] if len(row) > 23 else ''  # Column X
                     })
                     
-                    print(f"🔍 DEBUG: Processed row data: {sheet_data[-1]}")
+                    logger.debug("Processed row data: %s", sheet_data[-1])
             
             return sheet_data
             
@@ -178,37 +207,32 @@ class BatchWebhookHandler:
     
     def generate_qr_code_image(self, row_data):
         """Generate QR code image for a single row"""
-        try:
-            print(f"🔍 DEBUG: Processing row {row_data['row']}")
-            print(f"🔍 DEBUG: QR code value from sheet: '{row_data.get('qr_code_value', 'NOT_FOUND')}'")
-            print(f"🔍 DEBUG: QR code from sheet: '{row_data.get('qr_code', 'NOT_FOUND')}'")
-            print(f"🔍 DEBUG: Full row_data keys: {list(row_data.keys())}")
-            
-            # Use the existing GitHubWebhookHandler to generate the image
-            result = self.handler.handle_webhook_request(
-                product_name=row_data['product_name'],
-                landing_page_url=row_data['landing_page'],
-                farm_name=row_data['farm_name'],
-                state=row_data['state'],
-                country=row_data['country'],
-                year=row_data['year'],
-                is_cacao=True,  # Default to cacao, could be determined from product data
-                auto_commit=True,
-                sheet_data=row_data
-            )
-            
-            print(f"🔍 DEBUG: Result from handle_webhook_request: {result}")
-            
-            if result.get('success') and result.get('local_image_path'):
-                print(f"🔍 DEBUG: Generated image path: {result['local_image_path']}")
-                print(f"🔍 DEBUG: Expected QR code: {result.get('qr_code', 'NOT_FOUND')}")
-                return result['local_image_path']
-            else:
-                raise Exception(f"Failed to generate image: {result.get('error', 'Unknown error')}")
-                
-        except Exception as e:
-            print(f"❌ Error generating QR code image: {e}")
-            return None
+        return generate_qr_code_image(self.handler, row_data)
+    
+    def find_already_uploaded_rows(self, sheet_data):
+        """Return the row numbers whose PNG already exists on GitHub (checked concurrently)"""
+        def check(row_data):
+            target_repo, target_path = self.handler.resolve_upload_target(row_data['qr_code'], row_data)
+            return self.handler._already_uploaded(row_data['qr_code'], target_repo or GITHUB_REPOSITORY, target_path)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(GITHUB_UPLOAD_WORKERS, len(sheet_data)))) as executor:
+            exists = list(executor.map(check, sheet_data))
+        return {row_data['row'] for row_data, found in zip(sheet_data, exists) if found}
+    
+    def upload_generated_images(self, generated_images):
+        """Upload generated images with one Git Data API commit per target repository"""
+        entries_by_repo = {}
+        for img_data in generated_images:
+            if img_data.get('already_uploaded'):
+                continue
+            target_repo, target_path = self.handler.resolve_upload_target(img_data['qr_code'], img_data['row_data'])
+            with open(img_data['image_path'], 'rb') as f:
+                entries_by_repo.setdefault(target_repo, []).append((target_path, f.read()))
+        
+        for target_repo, entries in entries_by_repo.items():
+            commit_message = f"Add {len(entries)} QR code(s) from batch [skip ci]"
+            result = self.handler.upload_batch_to_github(entries, commit_message, target_repo)
+            print(f"✅ Committed {len(entries)} QR code image(s) to {result['repository']}: {result['commit_url']}")
     
     def create_zip_file(self, generated_images, zip_file_name):
         """Create a zip file containing all generated images"""
@@ -345,6 +369,53 @@ TrueSight DAO QR Code System
                 'message': f'Error sending email: {e}'
             }
 
+def generate_qr_code_image(handler, row_data):
+    """Generate the QR code image for a single row with `handler`; returns the local path or None"""
+    try:
+        logger.debug("Processing row %s: QR code value %r", row_data['row'], row_data.get('qr_code_value', 'NOT_FOUND'))
+
+        # Use the existing GitHubWebhookHandler to generate the image
+        result = handler.handle_webhook_request(
+            product_name=row_data['product_name'],
+            landing_page_url=row_data['landing_page'],
+            farm_name=row_data['farm_name'],
+            state=row_data['state'],
+            country=row_data['country'],
+            year=row_data['year'],
+            is_cacao=True,  # Default to cacao, could be determined from product data
+            auto_commit=False,  # uploaded together in upload_generated_images
+            sheet_data=row_data,
+            keep_local_copy=True  # the zip step reads the images back from disk
+        )
+
+        logger.debug("Result from handle_webhook_request: %s", result)
+
+        if result.get('success') and result.get('local_image_path'):
+            logger.debug("Generated image path: %s", result['local_image_path'])
+            return result['local_image_path']
+        else:
+            raise Exception(f"Failed to generate image: {result.get('error', 'Unknown error')}")
+
+    except Exception as e:
+        print(f"❌ Error generating QR code image: {e}")
+        return None
+
+# Per-process renderer used by render_one (set by _init_render_worker)
+_render_handler = None
+
+def _init_render_worker(github_token):
+    """Build a bare GitHubWebhookHandler once in each render worker process.
+
+    Fonts were already installed by the parent's handler, so workers skip
+    install_fonts (concurrent apt-get runs would contend for the dpkg lock).
+    """
+    global _render_handler
+    _render_handler = GitHubWebhookHandler(github_token=github_token, install_fonts=False)
+
+def render_one(row_data):
+    """Render one sheet row in a worker process; returns the local image path or None"""
+    return generate_qr_code_image(_render_handler, row_data)
+
 def main():
     """Main function to handle command line arguments"""
     parser = argparse.ArgumentParser(description="Batch QR Code Generation Webhook Handler")
@@ -354,8 +425,11 @@ def main():
     parser.add_argument("--digital-signature", help="Digital signature of the requestor")
     parser.add_argument("--requestor-email", help="Email address of the requestor")
     parser.add_argument("--output-file", help="Output file for results (JSON)")
+    parser.add_argument("--skip-existing", action="store_true", help="Don't re-upload PNGs that already exist on GitHub (they are still included in the zip)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log per-row debug details")
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
     
     # Initialize handler
     handler = BatchWebhookHandler()
@@ -367,7 +441,8 @@ def main():
             end_row=args.end_row,
             zip_file_name=args.zip_file_name,
             digital_signature=args.digital_signature,
-            requestor_email=args.requestor_email
+            requestor_email=args.requestor_email,
+            skip_existing=args.skip_existing
         )
         
         # Output results
@@ -14,16 +14,22 @@ Usage:
 """
 
 import argparse
+import base64
+import functools
+import io
 import json
+import logging
 import os
 import sys
 import requests
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import qrcode
 from qrcode.constants import ERROR_CORRECT_H
+import PIL
 from PIL import Image, ImageDraw, ImageFont
 
 # Configuration
@@ -41,6 +47,67 @@ GITHUB_WORKSPACE = os.path.join(os.getcwd(), 'to_upload')
 # PRODUCTION: Google Sheets configuration
 SHEET_URL = "https://docs.google.com/spreadsheets/d/1GE7PUq-UT6x2rBN-Q2ksogbWpgyuh2SaxJyG_uEK6PU/edit?gid=1552160318#gid=1552160318"
 
+logger = logging.getLogger(__name__)
+
+# Maximum concurrent GitHub API requests when uploading a batch
+GITHUB_UPLOAD_WORKERS = 16
+
+# zlib level for QR PNGs: level 3 encodes ~2x faster than the default 6 and is no larger on these labels
+PNG_COMPRESS_LEVEL = 3
+
+# QR label layout and scaling constants (from batch_compiler.py)
+CANVAS_BASE_WIDTH = 450
+CANVAS_BASE_HEIGHT = 350
+CANVAS_SCALE = 1
+QR_BASE_SIZE = 320
+QR_RATIO = 0.5
+
+# Font size defaults
+DEFAULT_HARVEST_FONT_SIZE = 18
+DEFAULT_INFO_FONT_SIZE = 25
+DEFAULT_PLANT_FONT_SIZE = 20
+DEFAULT_SERIAL_FONT_SIZE = 22
+MIN_FONT_RATIO = 0.02
+MIN_FONT_SIZE = 6
+
+# Spacing ratios
+SIDE_MARGIN_RATIO = 0.05
+QR_TO_HARVEST_RATIO = 0.0001
+HARVEST_TO_INFO_RATIO = 0.10
+INFO_TO_PLANT_RATIO = 0.07
+BOTTOM_MARGIN_RATIO = 0.05
+RIGHT_MARGIN_SERIAL_RATIO = 0.05
+
+# Fixed positions (from batch_compiler.py)
+FIXED_QR_Y = -31              # Shifted up by 1 pixel
+FIXED_HARVEST_Y = 259
+FIXED_INFO_Y = 279
+FIXED_PLANT_Y = 309
+# The vertical serial number is always centred, so it has no fixed position
+
+# Logo configuration
+LOGO_RATIO = 0.2
+
+BASE_QR_CHECK_URL = 'https://edgar.truesight.me/agroverse/qr-code-check?qr_code='
+
+# Derived layout, computed once: every label uses the same canvas
+BG_W = CANVAS_BASE_WIDTH * CANVAS_SCALE
+BG_H = CANVAS_BASE_HEIGHT * CANVAS_SCALE
+QR_SIZE = QR_BASE_SIZE * CANVAS_SCALE
+SIDE_MARGIN = int(BG_W * SIDE_MARGIN_RATIO)
+RIGHT_MARGIN_SERIAL = int(BG_W * RIGHT_MARGIN_SERIAL_RATIO)
+QR_TO_HARVEST_GAP = int(BG_H * QR_TO_HARVEST_RATIO)
+HARVEST_TO_INFO_GAP = int(BG_H * HARVEST_TO_INFO_RATIO)
+INFO_TO_PLANT_GAP = int(BG_H * INFO_TO_PLANT_RATIO)
+BOTTOM_MARGIN = int(BG_H * BOTTOM_MARGIN_RATIO)
+MIN_FONT = max(MIN_FONT_SIZE, int(BG_H * MIN_FONT_RATIO))
+HARVEST_FONT_SIZE = max(MIN_FONT, DEFAULT_HARVEST_FONT_SIZE)
+INFO_FONT_SIZE = max(MIN_FONT, DEFAULT_INFO_FONT_SIZE)
+PLANT_FONT_SIZE = max(MIN_FONT, DEFAULT_PLANT_FONT_SIZE)
+SERIAL_FONT_SIZE = max(MIN_FONT, DEFAULT_SERIAL_FONT_SIZE)
+# With every position pinned, labels skip the dynamic layout arithmetic
+FIXED_LAYOUT = None not in (FIXED_QR_Y, FIXED_HARVEST_Y, FIXED_INFO_Y, FIXED_PLANT_Y)
+
 CURRENCIES_SHEET_NAME = "Currencies"
 QR_CODES_SHEET_NAME = "Agroverse QR codes"
 
@@ -102,6 +169,93 @@ def parse_github_url(github_url: str):
     print("🔍 DEBUG: Failed to parse GitHub URL")
     return None, None
 
+def _logo_candidates(is_cacao: bool):
+    """Candidate logo paths in priority order (local logos folder first)"""
+    logo_name = "agroverse_logo.jpeg" if is_cacao else "truesight_icon.png"
+    return [
+        os.path.join(os.path.dirname(__file__), "logos", logo_name),  # Local logos folder
+        os.path.join(os.getcwd(), "logos", logo_name),  # Local logos folder (current dir)
+        os.path.join(os.path.dirname(__file__), logo_name),
+        os.path.join(os.path.dirname(__file__), "assets", logo_name),
+        os.path.join(os.getcwd(), logo_name),
+        os.path.join(os.getcwd(), "assets", logo_name)
+    ]
+
+@functools.cache
+def _resolve_logo(is_cacao: bool):
+    """Return the first existing logo path, searched once per process"""
+    for path in _logo_candidates(is_cacao):
+        if os.path.isfile(path):
+            return path
+    return None
+
+@functools.lru_cache(maxsize=32)
+def _load_logo(logo_path, max_logo_size):
+    """Decode and resize a logo once per (path, size); renders reuse the cached image"""
+    logo = Image.open(logo_path).convert("RGBA")
+    logo.thumbnail((max_logo_size, max_logo_size), Image.Resampling.LANCZOS)
+    return logo
+
+# Canvas-independent drawing context used only to measure text
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+@functools.lru_cache(maxsize=1024)
+def _text_size(txt, fnt):
+    """Width and height of txt drawn in fnt, measured once per (text, font)"""
+    if hasattr(_MEASURE_DRAW, 'textbbox'):
+        bbox = _MEASURE_DRAW.textbbox((0, 0), txt, font=fnt)
+        return bbox[2] - bbox[0], bbox[3] - bbox[1]
+    else:
+        mask = fnt.getmask(txt)
+        return mask.size
+
+# Font files in priority order: local files bundled with the code, then system fonts
+FONT_CANDIDATES = [
+    'arial.ttf',  # Local Arial font
+    'arial_bold.ttf',  # Local Arial Bold font
+    '/System/Library/Fonts/ArialHB.ttc',  # macOS Arial
+    '/System/Library/Fonts/Courier.ttc',  # macOS Courier
+    '/System/Library/Fonts/Helvetica.ttc',  # macOS Helvetica
+    '/System/Library/Fonts/HelveticaNeue.ttc',  # macOS Helvetica Neue
+    '/System/Library/Fonts/Times.ttc',  # macOS Times
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux DejaVu
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',  # Linux Liberation
+    '/usr/share/fonts/TTF/arial.ttf',  # Linux Arial
+    '/usr/share/fonts/TTF/courier.ttf',  # Linux Courier
+]
+
+@functools.cache
+def _resolve_font_path():
+    """Return the first font file that loads, searched once per process (after install_fonts has run)"""
+    for font_path in FONT_CANDIDATES:
+        if not os.path.exists(font_path):
+            continue
+        try:
+            ImageFont.truetype(font_path, MIN_FONT_SIZE)
+        except Exception as e:
+            print(f"❌ Failed to load font {font_path}: {e}")
+            continue
+        print(f"✅ Using font: {font_path}")
+        return font_path
+    print("🔄 No font file found, falling back to default font")
+    return None
+
+@functools.lru_cache(maxsize=256)
+def _text_mask(txt, fnt):
+    """Glyph coverage of txt in fnt, rasterized once; labels repeat the same lines across a batch"""
+    left, top, right, bottom = _MEASURE_DRAW.textbbox((0, 0), txt, font=fnt)
+    mask = Image.new("L", (right, bottom), 0)
+    ImageDraw.Draw(mask).text((0, 0), txt, fill=255, font=fnt)
+    return mask
+
+@functools.lru_cache(maxsize=32)
+def _load_font(size):
+    """Load the resolved font at this size (parsed once per size per process)"""
+    font_path = _resolve_font_path()
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default()
+
 def fetch_sheet_row(row_number: int):
     """Fetch data from a specific row in the Agroverse QR codes sheet"""
     try:
@@ -214,16 +368,23 @@ def fetch_sheet_row(row_number: int):
         return None
 
 class GitHubWebhookHandler:
-    def __init__(self, github_token=None):
+    def __init__(self, github_token=None, install_fonts=True):
         self.github_token = github_token or GITHUB_TOKEN
         self.workspace = GITHUB_WORKSPACE
         self.target_path = None
+        self._git_ready = False
+        self._qr = None
         
         # Ensure to_upload directory exists
         os.makedirs(self.workspace, exist_ok=True)
         
-        # Install fonts for GitHub Actions environment
-        self.install_fonts()
+        # Install fonts for GitHub Actions environment (render workers skip this;
+        # the parent process has already done it)
+        if install_fonts:
+            self.install_fonts()
+            
+            # Pillow-SIMD releases carry a .postN suffix
+            self.log(f"🖼️ Using Pillow {PIL.__version__}{' (SIMD build)' if '.post' in PIL.__version__ else ''}")
         
     def install_fonts(self):
         """Install fonts for GitHub Actions environment"""
@@ -270,201 +431,74 @@ class GitHubWebhookHandler:
         return f"{year}_{date_str}_{product_hash}"
     
     def create_qr_image(self, qr_code_value, output_path, farm_name=None, state=None, country=None, year=None, is_cacao=False):
-        """Create QR code image with the same design as batch_compiler.py"""
+        """Create QR code image with the same design as batch_compiler.py and save it to output_path"""
+        png_bytes = self.render_qr_to_bytes(qr_code_value, farm_name, state, country, year, is_cacao)
+        with open(output_path, 'wb') as f:
+            f.write(png_bytes)
+        self.log(f"QR code image saved to: {output_path}")
+        return output_path
+    
+    def render_qr_to_bytes(self, qr_code_value, farm_name=None, state=None, country=None, year=None, is_cacao=False):
+        """Render the QR code image in memory and return the PNG bytes"""
         self.log(f"Creating QR code image: {qr_code_value}")
         
-        # Layout and scaling constants (from batch_compiler.py)
-        CANVAS_BASE_WIDTH = 450
-        CANVAS_BASE_HEIGHT = 350
-        CANVAS_SCALE = 1
-        QR_BASE_SIZE = 320
-        QR_RATIO = 0.5
-        
-        # Font size defaults
-        DEFAULT_HARVEST_FONT_SIZE = 18
-        DEFAULT_INFO_FONT_SIZE = 25
-        DEFAULT_PLANT_FONT_SIZE = 20
-        DEFAULT_SERIAL_FONT_SIZE = 22
-        MIN_FONT_RATIO = 0.02
-        MIN_FONT_SIZE = 6
-        
-        # Spacing ratios
-        SIDE_MARGIN_RATIO = 0.05
-        QR_TO_HARVEST_RATIO = 0.0001
-        HARVEST_TO_INFO_RATIO = 0.10
-        INFO_TO_PLANT_RATIO = 0.07
-        BOTTOM_MARGIN_RATIO = 0.05
-        RIGHT_MARGIN_SERIAL_RATIO = 0.05
-        
-        # Fixed positions (from batch_compiler.py)
-        FIXED_QR_Y = -31              # Shifted up by 1 pixel
-        FIXED_HARVEST_Y = 259
-        FIXED_INFO_Y = 279
-        FIXED_PLANT_Y = 309
-        FIXED_SERIAL_Y = 324
-        
-        # Logo configuration
-        LOGO_RATIO = 0.2
-        
-        # Try multiple paths for logo files (prioritize local logos folder)
-        possible_cacao_logo_paths = [
-            os.path.join(os.path.dirname(__file__), "logos", "agroverse_logo.jpeg"),  # Local logos folder
-            os.path.join(os.getcwd(), "logos", "agroverse_logo.jpeg"),  # Local logos folder (current dir)
-            os.path.join(os.path.dirname(__file__), "agroverse_logo.jpeg"),
-            os.path.join(os.path.dirname(__file__), "assets", "agroverse_logo.jpeg"),
-            os.path.join(os.getcwd(), "agroverse_logo.jpeg"),
-            os.path.join(os.getcwd(), "assets", "agroverse_logo.jpeg")
-        ]
-        
-        possible_non_cacao_logo_paths = [
-            os.path.join(os.path.dirname(__file__), "logos", "truesight_icon.png"),  # Local logos folder
-            os.path.join(os.getcwd(), "logos", "truesight_icon.png"),  # Local logos folder (current dir)
-            os.path.join(os.path.dirname(__file__), "truesight_icon.png"),
-            os.path.join(os.path.dirname(__file__), "assets", "truesight_icon.png"),
-            os.path.join(os.getcwd(), "truesight_icon.png"),
-            os.path.join(os.getcwd(), "assets", "truesight_icon.png")
-        ]
-        
-        # Find the first available logo file
-        logo_path = None
-        if is_cacao:
-            for path in possible_cacao_logo_paths:
-                if os.path.exists(path):
-                    logo_path = path
-                    break
-        else:
-            for path in possible_non_cacao_logo_paths:
-                if os.path.exists(path):
-                    logo_path = path
-                    break
+        # Find the first available logo file (resolved once per process)
+        logo_path = _resolve_logo(bool(is_cacao))
         
         # Generate QR code with BASE_QR_CHECK_URL (from batch_compiler.py)
-        BASE_QR_CHECK_URL = 'https://edgar.truesight.me/agroverse/qr-code-check?qr_code='
         qr_url = BASE_QR_CHECK_URL + qr_code_value
         
-        qr = qrcode.QRCode(
-            version=None,
-            error_correction=ERROR_CORRECT_H,
-            box_size=10,
-            border=8,  # Increased border for better margins
-        )
+        # One encoder per handler; reset its data and fitted version for each code
+        if self._qr is None:
+            self._qr = qrcode.QRCode(
+                version=None,
+                error_correction=ERROR_CORRECT_H,
+                box_size=10,
+                border=8,  # Increased border for better margins
+            )
+        qr = self._qr
+        qr.clear()
+        qr.version = None
         qr.add_data(qr_url)
         qr.make(fit=True)
         
-        qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
+        # Rasterize the module matrix (border included) at one pixel per module and
+        # scale up with NEAREST; same pixels as make_image without per-module drawing
+        matrix = qr.get_matrix()
+        modules = len(matrix)
+        qr_img = Image.frombytes("L", (modules, modules), bytes(0 if cell else 255 for row in matrix for cell in row))
+        qr_img = qr_img.resize((modules * qr.box_size, modules * qr.box_size), Image.Resampling.NEAREST)
         
-        # Embed logo if available
-        if logo_path and os.path.exists(logo_path):
+        # Embed logo if available (the QR stays single-channel L until it needs colour)
+        if logo_path:
             try:
-                logo = Image.open(logo_path).convert("RGBA")
+                qr_img = qr_img.convert("RGB")
                 qr_w, qr_h = qr_img.size
-                max_logo_size = int(min(qr_w, qr_h) * LOGO_RATIO)
-                try:
-                    resample = Image.Resampling.LANCZOS
-                except AttributeError:
-                    resample = Image.LANCZOS
-                logo.thumbnail((max_logo_size, max_logo_size), resample)
+                logo = _load_logo(logo_path, int(min(qr_w, qr_h) * LOGO_RATIO))
                 lw, lh = logo.size
                 pos = ((qr_w - lw) // 2, (qr_h - lh) // 2)
-                qr_img.paste(logo, pos, logo)
-                self.log(f"✅ Embedded logo: {os.path.basename(logo_path)}")
+                # Only the logo's footprint needs alpha; blend it in RGBA and paste it back
+                region = qr_img.crop((pos[0], pos[1], pos[0] + lw, pos[1] + lh)).convert("RGBA")
+                region.alpha_composite(logo)
+                qr_img.paste(region.convert("RGB"), pos)
+                logger.debug("Embedded logo: %s", logo_path)
             except Exception as e:
                 self.log(f"⚠️ Warning: Could not embed logo: {e}")
                 self.log(f"📁 Logo path attempted: {logo_path}")
         else:
             self.log(f"⚠️ Logo not found. Searched paths:")
-            if is_cacao:
-                for path in possible_cacao_logo_paths:
-                    self.log(f"   - {path} {'✅' if os.path.exists(path) else '❌'}")
-            else:
-                for path in possible_non_cacao_logo_paths:
-                    self.log(f"   - {path} {'✅' if os.path.exists(path) else '❌'}")
+            for path in _logo_candidates(bool(is_cacao)):
+                self.log(f"   - {path} {'✅' if os.path.exists(path) else '❌'}")
             self.log("🔄 Continuing without logo...")
         
-        # Create canvas (white background)
-        scale = CANVAS_SCALE
-        bg_w = CANVAS_BASE_WIDTH * scale
-        bg_h = CANVAS_BASE_HEIGHT * scale
-        template = Image.new("RGBA", (bg_w, bg_h), (255, 255, 255, 255))
+        # Create canvas (white background, no alpha: the label is fully opaque)
+        bg_w, bg_h = BG_W, BG_H
+        template = Image.new("RGB", (bg_w, bg_h), (255, 255, 255))
         
         # Resize QR code
-        qr_size = QR_BASE_SIZE * scale
-        try:
-            resample = Image.Resampling.LANCZOS
-        except AttributeError:
-            resample = Image.LANCZOS
-        qr_img = qr_img.resize((qr_size, qr_size), resample)
+        qr_img = qr_img.resize((QR_SIZE, QR_SIZE), Image.Resampling.LANCZOS)
         qr_w, qr_h = qr_img.size
         
-        draw = ImageDraw.Draw(template)
-        
-        # Helper to measure text size
-        def text_size(txt, fnt):
-            if hasattr(draw, 'textbbox'):
-                bbox = draw.textbbox((0, 0), txt, font=fnt)
-                return bbox[2] - bbox[0], bbox[3] - bbox[1]
-            else:
-                mask = fnt.getmask(txt)
-                return mask.size
-        
-        # Helper to load font
-        def load_font(size):
-            # Try local font files first (bundled with the code)
-            local_fonts = [
-                'arial.ttf',  # Local Arial font
-                'arial_bold.ttf',  # Local Arial Bold font
-            ]
-            
-            # Try system fonts as fallback
-            system_fonts = [
-                '/System/Library/Fonts/ArialHB.ttc',  # macOS Arial
-                '/System/Library/Fonts/Courier.ttc',  # macOS Courier
-                '/System/Library/Fonts/Helvetica.ttc',  # macOS Helvetica
-                '/System/Library/Fonts/HelveticaNeue.ttc',  # macOS Helvetica Neue
-                '/System/Library/Fonts/Times.ttc',  # macOS Times
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux DejaVu
-                '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',  # Linux Liberation
-                '/usr/share/fonts/TTF/arial.ttf',  # Linux Arial
-                '/usr/share/fonts/TTF/courier.ttf',  # Linux Courier
-            ]
-            
-            self.log(f"🔤 Attempting to load font with size {size}")
-            
-            # Try local fonts first
-            for font_path in local_fonts:
-                try:
-                    if os.path.exists(font_path):
-                        self.log(f"✅ Found local font: {font_path}")
-                        font = ImageFont.truetype(font_path, size)
-                        self.log(f"✅ Successfully loaded local font: {font_path} with size {size}")
-                        return font
-                except Exception as e:
-                    self.log(f"❌ Failed to load local font {font_path}: {e}")
-                    continue
-            
-            # Try system fonts as fallback
-            for font_path in system_fonts:
-                try:
-                    if os.path.exists(font_path):
-                        self.log(f"✅ Found system font: {font_path}")
-                        font = ImageFont.truetype(font_path, size)
-                        self.log(f"✅ Successfully loaded system font: {font_path} with size {size}")
-                        return font
-                except Exception as e:
-                    self.log(f"❌ Failed to load system font {font_path}: {e}")
-                    continue
-            
-            # Fallback to default font (works in GitHub Actions)
-            try:
-                self.log("🔄 Falling back to default font")
-                default_font = ImageFont.load_default()
-                self.log("✅ Successfully loaded default font")
-                return default_font
-            except Exception as e:
-                self.log(f"❌ Failed to load default font: {e}")
-                # Ultimate fallback - create a basic font
-                return None
-        
         # Prepare text lines (matching batch_compiler.py logic)
         if is_cacao:
             harvest_text = f"Harvest {year}" if year else "Pledge Confirmed"
@@ -481,124 +515,207 @@ class GitHubWebhookHandler:
         plant_text = "Your tree is getting planted"
         serial_text = qr_code_value  # This should be the QR code value from column A
         
-        # Determine fonts and spacing
-        side_margin = int(bg_w * SIDE_MARGIN_RATIO)
-        right_margin_serial = int(bg_w * RIGHT_MARGIN_SERIAL_RATIO)
-        min_font = max(MIN_FONT_SIZE, int(bg_h * MIN_FONT_RATIO))
-        
-        # Set font sizes
-        f_harvest_size = max(min_font, DEFAULT_HARVEST_FONT_SIZE)
-        f_info_size = max(min_font, DEFAULT_INFO_FONT_SIZE)
-        f_plant_size = max(min_font, DEFAULT_PLANT_FONT_SIZE)
-        f_serial_size = max(min_font, DEFAULT_SERIAL_FONT_SIZE)
-        
         # Load fonts
-        f_harvest = load_font(f_harvest_size)
-        f_info = load_font(f_info_size)
-        f_plant = load_font(f_plant_size)
-        f_serial = load_font(f_serial_size)
-        
-        # Ensure we have valid fonts (fallback to default if needed)
-        if f_harvest is None:
-            self.log("⚠️ Harvest font is None, using default")
-            f_harvest = ImageFont.load_default()
-        if f_info is None:
-            self.log("⚠️ Info font is None, using default")
-            f_info = ImageFont.load_default()
-        if f_plant is None:
-            self.log("⚠️ Plant font is None, using default")
-            f_plant = ImageFont.load_default()
-        if f_serial is None:
-            self.log("⚠️ Serial font is None, using default")
-            f_serial = ImageFont.load_default()
-        
-        self.log(f"📝 Fonts loaded - Harvest: {type(f_harvest)}, Info: {type(f_info)}, Plant: {type(f_plant)}, Serial: {type(f_serial)}")
-        
-        # Measure text heights
-        _, h1 = text_size(harvest_text, f_harvest)
-        _, h2 = text_size(info_text, f_info)
-        _, h3 = text_size(plant_text, f_plant)
-        w_serial, h_serial = text_size(serial_text, f_serial)
-        
-        # Vertical spacing
-        m1 = int(bg_h * QR_TO_HARVEST_RATIO)
-        m2 = int(bg_h * HARVEST_TO_INFO_RATIO)
-        m3 = int(bg_h * INFO_TO_PLANT_RATIO)
-        bottom_margin = int(bg_h * BOTTOM_MARGIN_RATIO)
-        
-        # Compute dynamic starting Y
-        total_h = qr_h + m1 + h1 + m2 + h2 + m3 + h3
-        dynamic_start_y = bg_h - bottom_margin - total_h
+        f_harvest = _load_font(HARVEST_FONT_SIZE)
+        f_info = _load_font(INFO_FONT_SIZE)
+        f_plant = _load_font(PLANT_FONT_SIZE)
+        f_serial = _load_font(SERIAL_FONT_SIZE)
+        
+        # Measure text (heights only matter for the dynamic layout)
+        w_harvest, h1 = _text_size(harvest_text, f_harvest)
+        w_info, h2 = _text_size(info_text, f_info)
+        w_plant, h3 = _text_size(plant_text, f_plant)
+        w_serial, h_serial = _text_size(serial_text, f_serial)
+        
+        # Determine Y positions for the QR code and text
+        if FIXED_LAYOUT:
+            qr_y, harvest_y, info_y, plant_y = FIXED_QR_Y, FIXED_HARVEST_Y, FIXED_INFO_Y, FIXED_PLANT_Y
+        else:
+            # Compute dynamic starting Y
+            m1, m2, m3 = QR_TO_HARVEST_GAP, HARVEST_TO_INFO_GAP, INFO_TO_PLANT_GAP
+            total_h = qr_h + m1 + h1 + m2 + h2 + m3 + h3
+            dynamic_start_y = bg_h - BOTTOM_MARGIN - total_h
+            qr_y = FIXED_QR_Y if FIXED_QR_Y is not None else dynamic_start_y
+            harvest_y = FIXED_HARVEST_Y if FIXED_HARVEST_Y is not None else qr_y + qr_h + m1
+            info_y = FIXED_INFO_Y if FIXED_INFO_Y is not None else harvest_y + h1 + m2
+            plant_y = FIXED_PLANT_Y if FIXED_PLANT_Y is not None else info_y + h2 + m3
         
         # Paste QR code (centered horizontally)
         qr_x = (bg_w - qr_w) // 2
-        qr_y = FIXED_QR_Y if FIXED_QR_Y is not None else dynamic_start_y
-        template.paste(qr_img, (qr_x, qr_y), qr_img)
-        
-        # Determine Y positions for text
-        harvest_y = FIXED_HARVEST_Y if FIXED_HARVEST_Y is not None else qr_y + qr_h + m1
-        info_y = FIXED_INFO_Y if FIXED_INFO_Y is not None else harvest_y + h1 + m2
-        plant_y = FIXED_PLANT_Y if FIXED_PLANT_Y is not None else info_y + h2 + m3
+        template.paste(qr_img, (qr_x, qr_y))
         
         # Draw harvest text (centered horizontally)
-        w_harvest, _ = text_size(harvest_text, f_harvest)
         x = (bg_w - w_harvest) // 2
-        self.log(f"🎨 Drawing harvest text: '{harvest_text}' at ({x}, {harvest_y}) with font {type(f_harvest)}")
-        draw.text((x, harvest_y), harvest_text, fill="black", font=f_harvest)
+        logger.debug("Drawing harvest text %r at (%s, %s)", harvest_text, x, harvest_y)
+        template.paste("black", (x, harvest_y), _text_mask(harvest_text, f_harvest))
         
         # Draw info text (centered horizontally)
-        w_info, _ = text_size(info_text, f_info)
         x = (bg_w - w_info) // 2
-        self.log(f"🎨 Drawing info text: '{info_text}' at ({x}, {info_y}) with font {type(f_info)}")
-        draw.text((x, info_y), info_text, fill="black", font=f_info)
+        logger.debug("Drawing info text %r at (%s, %s)", info_text, x, info_y)
+        template.paste("black", (x, info_y), _text_mask(info_text, f_info))
         
         # Draw planting message (centered horizontally)
-        w_plant, _ = text_size(plant_text, f_plant)
         x = (bg_w - w_plant) // 2
-        self.log(f"🎨 Drawing plant text: '{plant_text}' at ({x}, {plant_y}) with font {type(f_plant)}")
-        draw.text((x, plant_y), plant_text, fill="black", font=f_plant)
+        logger.debug("Drawing plant text %r at (%s, %s)", plant_text, x, plant_y)
+        template.paste("black", (x, plant_y), _text_mask(plant_text, f_plant))
         
         # Draw serial text (vertical, on the right)
         padding = 10
         serial_img = Image.new('RGBA', (w_serial + padding, h_serial + padding), (255, 255, 255, 0))
         serial_draw = ImageDraw.Draw(serial_img)
         serial_draw.text((padding // 2, padding // 2), serial_text, fill="black", font=f_serial)
-        serial_img = serial_img.rotate(90, expand=True, resample=Image.Resampling.LANCZOS)
+        serial_img = serial_img.transpose(Image.Transpose.ROTATE_90)  # exact 90° turn, no resampling
         sw, sh = serial_img.size
-        serial_x = bg_w - right_margin_serial - sw
+        serial_x = bg_w - RIGHT_MARGIN_SERIAL - sw
         serial_y = (bg_h - sh) // 2
         qr_right_edge = qr_x + qr_w
-        if serial_x < qr_right_edge + side_margin:
-            serial_x = qr_right_edge + side_margin
+        if serial_x < qr_right_edge + SIDE_MARGIN:
+            serial_x = qr_right_edge + SIDE_MARGIN
         template.paste(serial_img, (serial_x, serial_y), serial_img)
         
-        # Save the compiled image
-        template.save(output_path)
-        self.log(f"QR code image saved to: {output_path}")
-        return output_path
+        # Encode the compiled image as PNG in memory
+        buffer = io.BytesIO()
+        template.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+        return buffer.getvalue()
     
     def setup_git(self):
-        """Configure git for GitHub Actions (no longer needed with API approach)"""
+        """Configure git for GitHub Actions (no longer needed with API approach); runs once per handler"""
+        if getattr(self, '_git_ready', False):
+            return
         self.log("Git setup not needed - using GitHub API directly")
-        pass
+        self._git_ready = True
+    
+    def resolve_upload_target(self, qr_code_value, sheet_data=None):
+        """Resolve (repository, path) for a QR code image from the column K GitHub URL"""
+        target_repo = None
+        target_path = None
+        if sheet_data and sheet_data.get('github_url'):
+            target_repo, target_path = parse_github_url(sheet_data['github_url'])
+            if target_repo and target_path:
+                self.log(f"📁 Using target repository: {target_repo}")
+                self.log(f"📁 Using target path: {target_path}")
+                self.log(f"🔍 DEBUG: Final path from column K: {target_path}")
+            else:
+                self.log("⚠️ Could not parse GitHub URL from column K, using defaults")
+                target_path = f"{qr_code_value}.png"
+        else:
+            self.log("⚠️ No GitHub URL found in column K, using default path")
+            target_path = f"{qr_code_value}.png"
+        return target_repo, target_path
+    
+    def _already_uploaded(self, qr_code_value, repo, path):
+        """Return True if the QR code PNG is already published at its raw GitHub URL"""
+        raw_url = f"https://raw.githubusercontent.com/{repo}/main/{path}"
+        try:
+            return requests.head(raw_url, timeout=5).status_code == 200
+        except requests.RequestException as e:
+            self.log(f"⚠️ Could not check whether {qr_code_value} already exists: {e}")
+            return False
+    
+    def _github_headers(self):
+        """Headers for authenticated GitHub REST API calls"""
+        return {
+            "Authorization": f"token {self.github_token}",
+            "Accept": "application/vnd.github.v3+json",
+            "Content-Type": "application/json"
+        }
+    
+    def _github_api(self, method, url, expected_status, **kwargs):
+        """Call the GitHub REST API and return the JSON body, raising on unexpected status codes"""
+        response = requests.request(method, url, headers=self._github_headers(), **kwargs)
+        if response.status_code not in expected_status:
+            error_msg = f"GitHub API {method} {url} failed: {response.status_code} - {response.text}"
+            self.log(f"ERROR: {error_msg}")
+            raise Exception(error_msg)
+        return response.json()
+    
+    def upload_batch_to_github(self, entries, commit_message, repo=None, branch='main'):
+        """Upload several files to GitHub as a single commit using the Git Data API
+        
+        entries is a list of (path, file_bytes) tuples. A single entry falls back to
+        the Contents API via upload_to_github.
+        """
+        repo = repo or GITHUB_REPOSITORY
+        if not entries:
+            return {'raw_urls': {}, 'commit_url': None, 'repository': repo}
+        
+        if len(entries) == 1:
+            path, file_bytes = entries[0]
+            qr_code_value = os.path.splitext(os.path.basename(path))[0]
+            result = self.upload_to_github(qr_code_value, commit_message=commit_message, target_repo=repo, target_path=path, png_bytes=file_bytes)
+            return {
+                'raw_urls': {path: result.get('raw_url')},
+                'commit_url': result.get('commit_url'),
+                'repository': repo
+            }
+        
+        self.log(f"Uploading {len(entries)} files to {repo} in a single commit")
+        api_base = f"https://api.github.com/repos/{repo}/git"
+        
+        # Resolve the current head commit and its tree
+        ref_data = self._github_api("GET", f"{api_base}/ref/heads/{branch}", [200])
+        head_sha = ref_data['object']['sha']
+        head_commit = self._github_api("GET", f"{api_base}/commits/{head_sha}", [200])
+        base_tree_sha = head_commit['tree']['sha']
+        
+        # Upload one blob per file; requests releases the GIL while waiting on the socket,
+        # so the round-trips overlap across threads
+        def create_blob(file_bytes):
+            blob = self._github_api("POST", f"{api_base}/blobs", [201], json={
+                "content": base64.b64encode(file_bytes).decode('utf-8'),
+                "encoding": "base64"
+            })
+            return blob['sha']
+        
+        with ThreadPoolExecutor(max_workers=min(GITHUB_UPLOAD_WORKERS, len(entries))) as executor:
+            blob_shas = list(executor.map(create_blob, [file_bytes for _, file_bytes in entries]))
+        
+        tree_entries = [
+            {"path": path, "mode": "100644", "type": "blob", "sha": blob_sha}
+            for (path, _), blob_sha in zip(entries, blob_shas)
+        ]
+        
+        # One tree, one commit, one ref update
+        tree = self._github_api("POST", f"{api_base}/trees", [201], json={
+            "base_tree": base_tree_sha,
+            "tree": tree_entries
+        })
+        commit = self._github_api("POST", f"{api_base}/commits", [201], json={
+            "message": commit_message,
+            "tree": tree['sha'],
+            "parents": [head_sha]
+        })
+        self._github_api("PATCH", f"{api_base}/refs/heads/{branch}", [200], json={"sha": commit['sha']})
+        
+        commit_url = commit.get('html_url') or f"https://github.com/{repo}/commit/{commit['sha']}"
+        raw_urls = {path: f"https://raw.githubusercontent.com/{repo}/{branch}/{path}" for path, _ in entries}
+        
+        self.log(f"✅ Successfully committed {len(entries)} files to {repo}")
+        self.log(f"Commit URL: {commit_url}")
+        
+        return {
+            'raw_urls': raw_urls,
+            'commit_url': commit_url,
+            'repository': repo
+        }
     
-    def upload_to_github(self, qr_code_value, qr_image_path, commit_message=None, target_repo=None, target_path=None):
-        """Upload QR code image to GitHub using API"""
+    def upload_to_github(self, qr_code_value, qr_image_path=None, commit_message=None, target_repo=None, target_path=None, png_bytes=None):
+        """Upload QR code image to GitHub using API (from png_bytes if given, otherwise from qr_image_path)"""
         if not commit_message:
             commit_message = f"Add QR code: {qr_code_value} [skip ci]"
         
         self.log(f"Uploading QR code to GitHub: {qr_code_value}")
         
-        # Verify the file exists
-        if not os.path.exists(qr_image_path):
-            raise FileNotFoundError(f"QR code image not found at: {qr_image_path}")
-        
-        # Read the file and encode to base64
-        with open(qr_image_path, 'rb') as f:
-            file_content = f.read()
+        if png_bytes is None:
+            # Verify the file exists
+            if not qr_image_path or not os.path.exists(qr_image_path):
+                raise FileNotFoundError(f"QR code image not found at: {qr_image_path}")
+            
+            # Read the file
+            with open(qr_image_path, 'rb') as f:
+                png_bytes = f.read()
         
-        import base64
-        base64_content = base64.b64encode(file_content).decode('utf-8')
+        base64_content = base64.b64encode(png_bytes).decode('utf-8')
         
         # Use target repository and path if provided, otherwise use defaults
         repo = target_repo or GITHUB_REPOSITORY
@@ -697,7 +814,7 @@ class GitHubWebhookHandler:
                 return {
                     'raw_url': None,
                     'commit_url': None,
-                    'warning': f"File {qr_code_value}.png already exists on GitHub. Local file saved as {qr_image_path}"
+                    'warning': f"File {qr_code_value}.png already exists on GitHub. Local file saved as {qr_image_path}" if qr_image_path else f"File {qr_code_value}.png already exists on GitHub"
                 }
         
         elif response.status_code not in [200, 201]:
@@ -727,8 +844,16 @@ class GitHubWebhookHandler:
             'path': path
         }
     
-    def handle_webhook_request(self, product_name, landing_page_url=None, farm_name=None, state=None, country=None, year=None, is_cacao=False, auto_commit=True, sheet_data=None, target_path=None):
-        """Handle webhook request for QR code generation"""
+    def handle_webhook_request(self, product_name, landing_page_url=None, farm_name=None, state=None, country=None, year=None, is_cacao=False, auto_commit=True, sheet_data=None, target_path=None, keep_local_copy=None, skip_existing=False):
+        """Handle webhook request for QR code generation
+        
+        The image is rendered in memory. It is only written to the workspace when
+        auto_commit is disabled or keep_local_copy is True. With skip_existing, a
+        QR code whose PNG is already on GitHub is neither rendered nor uploaded.
+        """
+        if keep_local_copy is None:
+            keep_local_copy = not auto_commit
+        
         self.log(f"Starting QR code generation for product: {product_name}")
         
         try:
@@ -756,22 +881,36 @@ class GitHubWebhookHandler:
             self.log("Step 2: Setting up git...")
             self.setup_git()
             
+            # Skip rendering and upload entirely if the PNG is already on GitHub
+            if auto_commit and skip_existing:
+                existing_repo, existing_path = self.resolve_upload_target(qr_code_value, sheet_data)
+                existing_repo = existing_repo or GITHUB_REPOSITORY
+                if self._already_uploaded(qr_code_value, existing_repo, existing_path):
+                    self.log(f"⏭️ {existing_path} already exists in {existing_repo}, skipping generation and upload")
+                    return {
+                        'success': True,
+                        'skipped': True,
+                        'product_name': product_name,
+                        'qr_code': qr_code_value,
+                        'github_url': f"https://github.com/{existing_repo}/blob/main/{existing_path}",
+                        'raw_url': f"https://raw.githubusercontent.com/{existing_repo}/main/{existing_path}",
+                        'local_image_path': None,
+                        'landing_page': landing_page_url,
+                        'timestamp': datetime.now().isoformat()
+                    }
+            
             # Step 3: Create QR code image
             self.log("Step 3: Creating QR code image...")
-            qr_image_path = os.path.join(self.workspace, f"{qr_code_value}.png")
-            self.log(f"🔍 DEBUG: Creating QR code at path: {qr_image_path}")
-            self.log(f"🔍 DEBUG: Expected filename: {qr_code_value}.png")
-            self.create_qr_image(qr_code_value, qr_image_path, farm_name, state, country, year, is_cacao)
+            png_bytes = self.render_qr_to_bytes(qr_code_value, farm_name, state, country, year, is_cacao)
+            self.log(f"✅ QR code image rendered in memory ({len(png_bytes)} bytes)")
             
-            # Verify the file was created
-            if os.path.exists(qr_image_path):
-                self.log(f"✅ QR code image created successfully at: {qr_image_path}")
-                self.log(f"🔍 DEBUG: File size: {os.path.getsize(qr_image_path)} bytes")
-                self.log(f"🔍 DEBUG: Filename from path: {os.path.basename(qr_image_path)}")
-                self.log(f"🔍 DEBUG: Expected filename: {qr_code_value}.png")
-                self.log(f"🔍 DEBUG: Filenames match: {os.path.basename(qr_image_path) == f'{qr_code_value}.png'}")
-            else:
-                raise FileNotFoundError(f"QR code image was not created at: {qr_image_path}")
+            qr_image_path = None
+            if keep_local_copy:
+                qr_image_path = os.path.join(self.workspace, f"{qr_code_value}.png")
+                self.log(f"🔍 DEBUG: Saving local copy at path: {qr_image_path}")
+                with open(qr_image_path, 'wb') as f:
+                    f.write(png_bytes)
+                self.log(f"✅ QR code image saved to: {qr_image_path}")
             
             # Step 4: Upload to GitHub
             if auto_commit:
@@ -779,26 +918,13 @@ class GitHubWebhookHandler:
                 commit_message = f"Add QR code for {product_name}: {qr_code_value} [skip ci]"
                 
                 # Use the final path from column K (GitHub URL) directly
-                target_repo = None
-                target_path = None
-                if sheet_data and sheet_data.get('github_url'):
-                    target_repo, target_path = parse_github_url(sheet_data['github_url'])
-                    if target_repo and target_path:
-                        self.log(f"📁 Using target repository: {target_repo}")
-                        self.log(f"📁 Using target path: {target_path}")
-                        self.log(f"🔍 DEBUG: Final path from column K: {target_path}")
-                    else:
-                        self.log("⚠️ Could not parse GitHub URL from column K, using defaults")
-                        target_path = f"{qr_code_value}.png"
-                else:
-                    self.log("⚠️ No GitHub URL found in column K, using default path")
-                    target_path = f"{qr_code_value}.png"
+                target_repo, target_path = self.resolve_upload_target(qr_code_value, sheet_data)
                 
                 self.log(f"🔍 DEBUG: qr_code_value: {qr_code_value}")
                 self.log(f"🔍 DEBUG: target_path: {target_path}")
                 self.log(f"🔍 DEBUG: Final path will be: {target_path}")
                 
-                upload_result = self.upload_to_github(qr_code_value, qr_image_path, commit_message, target_repo, target_path or self.target_path)
+                upload_result = self.upload_to_github(qr_code_value, qr_image_path, commit_message, target_repo, target_path or self.target_path, png_bytes=png_bytes)
             
             # Return success result
             result = {
@@ -853,6 +979,8 @@ def main():
     parser.add_argument("--github-token", help="GitHub personal access token")
     parser.add_argument("--no-commit", action="store_true", help="Don't commit to GitHub")
     parser.add_argument("--target-path", help="Target path in the GitHub repo (e.g. pngs/E2E_TEST.png)")
+    parser.add_argument("--skip-existing", action="store_true", help="Skip generation and upload if the PNG already exists on GitHub")
+    parser.add_argument("--keep-local-copy", action="store_true", help="Also save the PNG to the to_upload workspace when committing")
     parser.add_argument("--output-file", help="Output file for results (JSON)")
     
     args = parser.parse_args()
@@ -909,7 +1037,9 @@ def main():
             target_path=args.target_path,
             is_cacao=is_cacao,
             auto_commit=not args.no_commit,
-            sheet_data=sheet_data
+            sheet_data=sheet_data,
+            keep_local_copy=True if args.keep_local_copy else None,
+            skip_existing=args.skip_existing
         )
         
         # Output results
@@ -1000,7 +1130,8 @@ def test_qr_generation(product_name=None, farm_name=None, state=None, country=No
                 year=test_year,
                 is_cacao=test_is_cacao,
                 auto_commit=True,
-                sheet_data=sheet_data
+                sheet_data=sheet_data,
+                keep_local_copy=True
             )
         else:
             # Use provided parameters
@@ -1012,7 +1143,8 @@ def test_qr_generation(product_name=None, farm_name=None, state=None, country=No
                 country=test_country,
                 year=test_year,
                 is_cacao=test_is_cacao,
-                auto_commit=True
+                auto_commit=True,
+                keep_local_copy=True
             )
         
         if result['success']:
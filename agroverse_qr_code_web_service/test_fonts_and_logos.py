@@ -3,6 +3,7 @@
 Test script to verify font and logo functionality in different environments
 """
 
+import functools
 import os
 import sys
 from pathlib import Path
@@ -10,7 +11,30 @@ from pathlib import Path
 # Add the current directory to the path so we can import the handler
 sys.path.insert(0, os.path.dirname(__file__))
 
-from github_webhook_handler import GitHubWebhookHandler
+from github_webhook_handler import GitHubWebhookHandler, _resolve_logo
+
+# Candidate fonts probed by test_font_loading (bare names resolve against cwd)
+TEST_FONT_PATHS = [
+    'cour.ttf',  # Courier New
+    'arial.ttf',  # Arial
+    'Helvetica.ttc',  # Helvetica
+    '/System/Library/Fonts/Arial.ttf',  # macOS Arial
+    '/System/Library/Fonts/Courier New.ttf',  # macOS Courier
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux DejaVu
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',  # Linux Liberation
+]
+
+@functools.cache
+def _available_fonts():
+    """Scan each candidate font directory once and return the set of entries found"""
+    available = set()
+    for directory in {os.path.dirname(path) or '.' for path in TEST_FONT_PATHS}:
+        try:
+            with os.scandir(directory) as entries:
+                available.update(os.path.normpath(entry.path) for entry in entries)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+    return available
 
 def test_font_loading():
     """Test font loading functionality"""
@@ -26,21 +50,13 @@ def test_font_loading():
             # Import the load_font function from the handler
             from PIL import ImageFont
             
-            # Test the font loading logic
-            system_fonts = [
-                'cour.ttf',  # Courier New
-                'arial.ttf',  # Arial
-                'Helvetica.ttc',  # Helvetica
-                '/System/Library/Fonts/Arial.ttf',  # macOS Arial
-                '/System/Library/Fonts/Courier New.ttf',  # macOS Courier
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux DejaVu
-                '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',  # Linux Liberation
-            ]
+            # Test the font loading logic (one directory scan instead of a stat per path)
+            available_fonts = _available_fonts()
             
             font_loaded = False
-            for font_path in system_fonts:
+            for font_path in TEST_FONT_PATHS:
                 try:
-                    if os.path.exists(font_path):
+                    if os.path.normpath(font_path) in available_fonts:
                         font = ImageFont.truetype(font_path, size)
                         print(f"✅ Loaded font: {font_path} (size: {size})")
                         font_loaded = True
@@ -63,30 +79,15 @@ def test_logo_finding():
     """Test logo file finding functionality"""
     print("\n🧪 Testing Logo File Finding...")
     
-    # Test paths for logo files
-    possible_cacao_logo_paths = [
-        os.path.join(os.path.dirname(__file__), "agroverse_logo.jpeg"),
-        os.path.join(os.path.dirname(__file__), "assets", "agroverse_logo.jpeg"),
-        os.path.join(os.getcwd(), "agroverse_logo.jpeg"),
-        os.path.join(os.getcwd(), "assets", "agroverse_logo.jpeg")
-    ]
-    
-    possible_non_cacao_logo_paths = [
-        os.path.join(os.path.dirname(__file__), "truesight_icon.png"),
-        os.path.join(os.path.dirname(__file__), "assets", "truesight_icon.png"),
-        os.path.join(os.getcwd(), "truesight_icon.png"),
-        os.path.join(os.getcwd(), "assets", "truesight_icon.png")
-    ]
+    # Same resolver the QR drawing code uses
+    cacao_logo = _resolve_logo(True)
+    non_cacao_logo = _resolve_logo(False)
     
-    print("🔍 Checking Cacao Logo Paths:")
-    for path in possible_cacao_logo_paths:
-        exists = os.path.exists(path)
-        print(f"   - {path} {'✅' if exists else '❌'}")
+    print(f"🔍 Cacao logo: {cacao_logo or 'not found'} {'✅' if cacao_logo else '❌'}")
+    print(f"🔍 Non-cacao logo: {non_cacao_logo or 'not found'} {'✅' if non_cacao_logo else '❌'}")
     
-    print("🔍 Checking Non-Cacao Logo Paths:")
-    for path in possible_non_cacao_logo_paths:
-        exists = os.path.exists(path)
-        print(f"   - {path} {'✅' if exists else '❌'}")
+    assert cacao_logo is not None, "Cacao logo (agroverse_logo.jpeg) not found"
+    assert non_cacao_logo is not None, "Non-cacao logo (truesight_icon.png) not found"
 
 def test_qr_generation():
     """Test QR code generation with fonts and logos"""
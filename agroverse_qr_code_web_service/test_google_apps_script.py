@@ -3,56 +3,107 @@
 Test script for Google Apps Script endpoints (batch QR / `qr_code_web_service.gs` deployment).
 """
 
+import argparse
+import os
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Google Apps Script URL
 GAS_URL = "https://script.google.com/macros/s/AKfycbySJ86OcVsk5gETTiJ-CY-zBZGHAQoZ8yVW-buxXMjOI9eEc3HP7AicHhtNICHoJo1z/exec"
 
-def test_endpoint(action, params=None):
-    """Test a Google Apps Script endpoint"""
+# On-disk response cache (requests-cache, optional) so repeated runs reuse recent bodies;
+# the currency list changes rarely
+CACHE_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gas_cache')
+CACHE_EXPIRE_SECONDS = 600
+
+def enable_response_cache():
+    """Cache GET responses in a SQLite file for CACHE_EXPIRE_SECONDS (if requests-cache is installed)"""
+    try:
+        import requests_cache
+    except ImportError:
+        print("ℹ️ requests-cache not installed, calling endpoints without a cache")
+        return
+    requests_cache.install_cache(CACHE_NAME, backend='sqlite', expire_after=CACHE_EXPIRE_SECONDS, allowable_methods=('GET',))
+
+def test_endpoint(action, params=None, session=None):
+    """Test a Google Apps Script endpoint
+    
+    Output is buffered and printed in one block so concurrent calls don't interleave.
+    """
     if params is None:
         params = {}
     
     params['action'] = action
+    http = session or requests
     
-    print(f"\n🧪 Testing {action} endpoint...")
-    print(f"URL: {GAS_URL}")
-    print(f"Params: {params}")
+    output = [f"\n🧪 Testing {action} endpoint...", f"URL: {GAS_URL}", f"Params: {params}"]
     
     try:
-        response = requests.get(GAS_URL, params=params, timeout=30)
-        print(f"Status Code: {response.status_code}")
+        response = http.get(GAS_URL, params=params, timeout=30)
+        output.append(f"Status Code: {response.status_code}")
+        if getattr(response, 'from_cache', False):
+            output.append("(served from local cache)")
         
         if response.status_code == 200:
             try:
                 data = response.json()
-                print(f"Response: {json.dumps(data, indent=2)}")
+                output.append(f"Response: {json.dumps(data, indent=2)}")
                 return data
             except json.JSONDecodeError:
-                print(f"Response (not JSON): {response.text[:500]}...")
+                output.append(f"Response (not JSON): {response.text[:500]}...")
                 return None
         else:
-            print(f"Error Response: {response.text[:500]}...")
+            output.append(f"Error Response: {response.text[:500]}...")
             return None
             
     except Exception as e:
-        print(f"Request failed: {e}")
+        output.append(f"Request failed: {e}")
         return None
+    finally:
+        print("\n".join(output))
+
+# Batch specs for the list, search (common term) and search (empty string) calls
+BATCH_ACTIONS = ['list', 'search:2024', 'search:']
+
+def run_batched(session):
+    """Run all three calls in one `action=batch` round-trip
+    
+    Returns (list_result, search_result, search_empty_result), or None if the
+    deployment doesn't support the batch action yet.
+    """
+    batch_result = test_endpoint('batch', {'actions': ','.join(BATCH_ACTIONS)}, session)
+    if not batch_result or batch_result.get('status') != 'success':
+        return None
+    
+    results = batch_result.get('data', {}).get('results', {})
+    return tuple(results.get(spec) for spec in BATCH_ACTIONS)
+
+def run_separately(session):
+    """Run the three calls as separate concurrent requests (older deployments)"""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list_future = executor.submit(test_endpoint, 'list', None, session)
+        search_future = executor.submit(test_endpoint, 'search', {'product_name': '2024'}, session)
+        search_empty_future = executor.submit(test_endpoint, 'search', {'product_name': ''}, session)
+        return list_future.result(), search_future.result(), search_empty_future.result()
 
 def main():
     """Test all endpoints"""
+    parser = argparse.ArgumentParser(description="Test Google Apps Script endpoints")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the live endpoints")
+    args = parser.parse_args()
+    if not args.no_cache:
+        enable_response_cache()
+    
     print("🚀 Testing Google Apps Script Endpoints")
     print("=" * 50)
     
-    # Test list endpoint
-    list_result = test_endpoint('list')
-    
-    # Test search endpoint with common term
-    search_result = test_endpoint('search', {'product_name': '2024'})
-    
-    # Test search endpoint with empty string
-    search_empty_result = test_endpoint('search', {'product_name': ''})
+    with requests.Session() as session:
+        results = run_batched(session)
+        if results is None:
+            print("⚠️ Batch action not available, falling back to separate calls")
+            results = run_separately(session)
+    list_result, search_result, search_empty_result = results
     
     # Summary
     print("\n" + "=" * 50)
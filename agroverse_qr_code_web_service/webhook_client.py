@@ -12,13 +12,26 @@ Usage examples:
 - For HTML/JavaScript frontend: Use call_google_app_script_webhook()
 - For automated workflows: Use trigger_repository_dispatch()
 - For manual triggers: Use trigger_workflow_dispatch()
+
+AsyncWebhookClient offers the same methods as coroutines over an HTTP/2 httpx client
+(optional dependency: pip install "httpx[http2]"); use --async on the command line.
 """
 
 import argparse
+import asyncio
 import json
-import requests
 import os
-from datetime import datetime
+import time
+
+# requests is imported where it is used so `--help` and argument errors don't pay
+# for loading the HTTP stack
+
+# (connect, read) timeout in seconds for every HTTP call
+DEFAULT_TIMEOUT = (3.05, 15)
+
+def utc_timestamp():
+    """Current UTC time as an ISO 8601 string, e.g. 2024-05-01T12:00:00Z"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
 
 class WebhookClient:
     def __init__(self, google_script_url=None, github_token=None, repository=None):
@@ -26,6 +39,51 @@ class WebhookClient:
         self.github_token = github_token or os.environ.get('GITHUB_TOKEN')
         self.repository = repository or 'TrueSightDAO/tokenomics'
         
+        self._session = None
+    
+    @property
+    def session(self):
+        """One pooled session for all calls so TCP/TLS connections are reused (created on first use)"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            class PostSafeRetry(Retry):
+                # Every POST here acts on the server (appends a sheet row, opens an
+                # issue, starts a workflow run), and a 5xx or read timeout can arrive
+                # after it already did. POSTs are therefore only replayed on 429,
+                # which GitHub sends before acting; GETs follow the normal rules.
+                def is_retry(self, method, status_code, has_retry_after=False):
+                    if method.upper() == 'POST':
+                        return status_code == 429 and bool(self.total)
+                    return super().is_retry(method, status_code, has_retry_after)
+            
+            self._session = requests.Session()
+            self._session.mount('https://', HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=PostSafeRetry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 502, 503, 504],  # GitHub answers 429 under abuse detection
+                )
+            ))
+            self._session.headers.update({'Accept': 'application/vnd.github.v3+json'})
+        return self._session
+    
+    def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
     def call_google_app_script_webhook(self, product_name):
         """
         Call Google App Script webhook directly (for HTML/JavaScript frontend)
@@ -38,6 +96,8 @@ class WebhookClient:
         The HTML/JavaScript frontend can then optionally call the Python script
         to generate the actual QR code image.
         """
+        import requests
+        
         print(f"Calling Google App Script webhook for product: {product_name}")
         
         url = self.google_script_url
@@ -49,7 +109,7 @@ class WebhookClient:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = self.session.post(url, json=payload, headers=headers, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
             data = response.json()
@@ -70,26 +130,48 @@ class WebhookClient:
             print(f"❌ Invalid JSON response: {e}")
             return None
     
-    def trigger_repository_dispatch(self, sheet_row=None, product_name=None, landing_page_url=None, farm_name=None, state=None, country=None, year=None, event_type='qr-code-generation'):
+    def _github_request(self, method, path, *, json=None, params=None, token_purpose, failure, success=None):
         """
-        Trigger GitHub Actions workflow via repository_dispatch event
+        Send a request to https://api.github.com/repos/{repository}{path} on the pooled session
         
-        This method is useful for automated workflows or when you want to
-        generate the QR code image as well.
+        Checks for a token, adds the auth header and handles errors in one place.
+        Returns the decoded JSON body, {'status': 'success', 'message': success} for
+        204 (no content) responses, or None on failure.
         """
+        import requests
+        
         if not self.github_token:
-            print("❌ GitHub token required for repository_dispatch")
+            print(f"❌ GitHub token required for {token_purpose}")
             return None
-            
-        url = f"https://api.github.com/repos/{self.repository}/dispatches"
+        
+        url = f"https://api.github.com/repos/{self.repository}{path}"
         headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
+            'Authorization': f'token {self.github_token}'
         }
-        
+        try:
+            response = self.session.request(method, url, json=json, params=params, headers=headers, timeout=DEFAULT_TIMEOUT)
+            response.raise_for_status()
+            return self._github_result(response, success)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Failed to {failure}: {e}")
+            return None
+    
+    @staticmethod
+    def _github_result(response, success):
+        """Decode a successful GitHub response (shared by the sync and async clients)"""
+        if success:
+            print(f"✅ {success}!")
+        # Dispatch endpoints return 204 (no content) on success
+        if response.status_code == 204:
+            return {"status": "success", "message": success}
+        return response.json()
+    
+    @staticmethod
+    def _dispatch_payload(sheet_row, product_name, landing_page_url, farm_name, state, country, year, event_type, timestamp):
+        """Build the repository_dispatch payload"""
         # Build client_payload based on what's provided
         client_payload = {
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp or utc_timestamp()
         }
         
         if sheet_row is not None:
@@ -105,23 +187,41 @@ class WebhookClient:
                 'year': year
             })
         
-        payload = {
+        return {
             'event_type': event_type,
             'client_payload': client_payload
         }
+    
+    @staticmethod
+    def _issue_payload(product_name, title, body, timestamp):
+        """Build the issue title/body that the webhook detects"""
+        if not title:
+            title = f"Generate QR Code: {product_name}"
+        if not body:
+            body = f"""
+QR Code Generation Request
+
+**Product Name:** {product_name}
+**Requested At:** {timestamp or utc_timestamp()}
+
+This issue will trigger the QR code generation workflow.
+            """.strip()
+        return {
+            'title': title,
+            'body': body
+        }
+    
+    def trigger_repository_dispatch(self, sheet_row=None, product_name=None, landing_page_url=None, farm_name=None, state=None, country=None, year=None, event_type='qr-code-generation', timestamp=None):
+        """
+        Trigger GitHub Actions workflow via repository_dispatch event
         
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            print("✅ Repository dispatch triggered successfully!")
-            # GitHub repository dispatch returns 204 (no content) on success
-            if response.status_code == 204:
-                return {"status": "success", "message": "Repository dispatch triggered successfully"}
-            else:
-                return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Failed to trigger repository dispatch: {e}")
-            return None
+        This method is useful for automated workflows or when you want to
+        generate the QR code image as well. Pass `timestamp` to share one
+        timestamp across a bulk trigger.
+        """
+        payload = self._dispatch_payload(sheet_row, product_name, landing_page_url, farm_name, state, country, year, event_type, timestamp)
+        return self._github_request('POST', '/dispatches', json=payload, token_purpose='repository_dispatch',
+                                    failure='trigger repository dispatch', success='Repository dispatch triggered successfully')
     
     def trigger_workflow_dispatch(self, product_name, workflow_id='qr-code-webhook.yml'):
         """
@@ -129,107 +229,154 @@ class WebhookClient:
         
         This method allows manual triggering of the workflow.
         """
-        if not self.github_token:
-            print("❌ GitHub token required for workflow_dispatch")
-            return None
-            
-        url = f"https://api.github.com/repos/{self.repository}/actions/workflows/{workflow_id}/dispatches"
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        payload = {
-            'ref': 'main',
-            'inputs': {
-                'product_name': product_name
-            }
-        }
-        
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            print("✅ Workflow dispatch triggered successfully!")
-            # GitHub workflow dispatch returns 204 (no content) on success
-            if response.status_code == 204:
-                return {"status": "success", "message": "Workflow dispatch triggered successfully"}
-            else:
-                return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Failed to trigger workflow dispatch: {e}")
-            return None
+        payload = {'ref': 'main', 'inputs': {'product_name': product_name}}
+        return self._github_request('POST', f'/actions/workflows/{workflow_id}/dispatches', json=payload, token_purpose='workflow_dispatch',
+                                    failure='trigger workflow dispatch', success='Workflow dispatch triggered successfully')
     
-    def create_issue_with_webhook(self, product_name, title=None, body=None):
+    def create_issue_with_webhook(self, product_name, title=None, body=None, timestamp=None):
         """
         Create a GitHub issue to trigger the webhook
         
         This method creates an issue with a special format that the webhook
         can detect and process.
         """
-        if not self.github_token:
-            print("❌ GitHub token required for issue creation")
-            return None
-            
-        if not title:
-            title = f"Generate QR Code: {product_name}"
-        if not body:
-            body = f"""
-QR Code Generation Request
-
-**Product Name:** {product_name}
-**Requested At:** {datetime.now().isoformat()}
+        data = self._github_request('POST', '/issues', json=self._issue_payload(product_name, title, body, timestamp),
+                                    token_purpose='issue creation', failure='create issue')
+        if data:
+            print(f"✅ Issue created successfully: {data['html_url']}")
+        return data
+    
+    def get_workflow_runs(self, workflow_id='qr-code-webhook.yml', per_page=10):
+        """
+        Get recent workflow runs for monitoring
+        """
+        return self._github_request('GET', f'/actions/workflows/{workflow_id}/runs', params={'per_page': per_page},
+                                    token_purpose='workflow runs', failure='get workflow runs')
 
-This issue will trigger the QR code generation workflow.
-            """.strip()
-            
-        url = f"https://api.github.com/repos/{self.repository}/issues"
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        payload = {
-            'title': title,
-            'body': body
-        }
+class AsyncWebhookClient(WebhookClient):
+    """Async variant of WebhookClient backed by httpx (HTTP/2 when `h2` is installed)
+    
+    Each method mirrors its WebhookClient counterpart and must be awaited:
+    
+        async with AsyncWebhookClient(github_token=token) as client:
+            await client.trigger_repository_dispatch(sheet_row=708)
+            runs = await client.get_workflow_runs()
+    
+    The GitHub token is sent per request, never as a client default, so it doesn't
+    leak to the Google App Script host.
+    """
+    
+    def __init__(self, google_script_url=None, github_token=None, repository=None):
+        super().__init__(google_script_url, github_token, repository)
+        self._client = None
+    
+    @property
+    def client(self):
+        """Shared httpx.AsyncClient so concurrent calls to one host share a connection"""
+        if self._client is None:
+            import httpx
+            try:
+                import h2  # noqa: F401 - only needed for HTTP/2 support
+                http2 = True
+            except ImportError:
+                http2 = False
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+                follow_redirects=True,  # Google App Script answers with a redirect
+                headers={'Accept': 'application/vnd.github.v3+json'}
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared httpx client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+    
+    def _auth_headers(self):
+        return {'Authorization': f'token {self.github_token}'}
+    
+    async def call_google_app_script_webhook(self, product_name):
+        """Async version of WebhookClient.call_google_app_script_webhook"""
+        import httpx
         
+        print(f"Calling Google App Script webhook for product: {product_name}")
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = await self.client.post(self.google_script_url, json={'product_name': product_name})
             response.raise_for_status()
+            
             data = response.json()
-            print(f"✅ Issue created successfully: {data['html_url']}")
-            return data
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Failed to create issue: {e}")
+            if data['status'] == 'success':
+                print("✅ QR code record created successfully!")
+                print(f"QR Code: {data['data']['qr_code']}")
+                print(f"GitHub URL: {data['data']['github_url']}")
+                print(f"Sheet Row: {data['data']['row_added']}")
+                return data['data']
+            else:
+                print(f"❌ Error: {data.get('message', 'Unknown error')}")
+                return None
+                
+        except httpx.HTTPError as e:
+            print(f"❌ Network error: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"❌ Invalid JSON response: {e}")
             return None
     
-    def get_workflow_runs(self, workflow_id='qr-code-webhook.yml', per_page=10):
-        """
-        Get recent workflow runs for monitoring
-        """
+    async def _github_request(self, method, path, *, json=None, params=None, token_purpose, failure, success=None):
+        """Async version of WebhookClient._github_request on the shared httpx client"""
+        import httpx
+        
         if not self.github_token:
-            print("❌ GitHub token required for workflow runs")
+            print(f"❌ GitHub token required for {token_purpose}")
             return None
-            
-        url = f"https://api.github.com/repos/{self.repository}/actions/workflows/{workflow_id}/runs"
-        headers = {
-            'Authorization': f'token {self.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        params = {
-            'per_page': per_page
-        }
         
+        url = f"https://api.github.com/repos/{self.repository}{path}"
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = await self.client.request(method, url, json=json, params=params, headers=self._auth_headers())
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Failed to get workflow runs: {e}")
+        except httpx.HTTPError as e:
+            print(f"❌ Failed to {failure}: {e}")
             return None
+        return self._github_result(response, success)
+    
+    async def trigger_repository_dispatch(self, sheet_row=None, product_name=None, landing_page_url=None, farm_name=None, state=None, country=None, year=None, event_type='qr-code-generation', timestamp=None):
+        """Async version of WebhookClient.trigger_repository_dispatch"""
+        payload = self._dispatch_payload(sheet_row, product_name, landing_page_url, farm_name, state, country, year, event_type, timestamp)
+        return await self._github_request('POST', '/dispatches', json=payload, token_purpose='repository_dispatch',
+                                          failure='trigger repository dispatch', success='Repository dispatch triggered successfully')
+    
+    async def trigger_workflow_dispatch(self, product_name, workflow_id='qr-code-webhook.yml'):
+        """Async version of WebhookClient.trigger_workflow_dispatch"""
+        payload = {'ref': 'main', 'inputs': {'product_name': product_name}}
+        return await self._github_request('POST', f'/actions/workflows/{workflow_id}/dispatches', json=payload, token_purpose='workflow_dispatch',
+                                          failure='trigger workflow dispatch', success='Workflow dispatch triggered successfully')
+    
+    async def create_issue_with_webhook(self, product_name, title=None, body=None, timestamp=None):
+        """Async version of WebhookClient.create_issue_with_webhook"""
+        data = await self._github_request('POST', '/issues', json=self._issue_payload(product_name, title, body, timestamp),
+                                          token_purpose='issue creation', failure='create issue')
+        if data:
+            print(f"✅ Issue created successfully: {data['html_url']}")
+        return data
+    
+    async def get_workflow_runs(self, workflow_id='qr-code-webhook.yml', per_page=10):
+        """Async version of WebhookClient.get_workflow_runs"""
+        return await self._github_request('GET', f'/actions/workflows/{workflow_id}/runs', params={'per_page': per_page},
+                                          token_purpose='workflow runs', failure='get workflow runs')
 
 def main():
     parser = argparse.ArgumentParser(description="Webhook Client for QR Code Generation")
     parser.add_argument("--sheet-row", type=int, help="Row number from Agroverse QR codes sheet to generate QR code for")
     parser.add_argument("--product-name", help="Product name to generate QR code for (alternative to sheet-row)")
+    parser.add_argument("--from-file", help="Text file with one product name per line to trigger in bulk")
     parser.add_argument("--method", choices=['google', 'dispatch', 'workflow', 'issue'], 
                        default='google', help="Method to trigger QR code generation")
     parser.add_argument("--landing-page-url", help="Landing page URL for the QR code")
@@ -241,55 +388,85 @@ def main():
     parser.add_argument("--github-token", help="GitHub personal access token")
     parser.add_argument("--repository", help="GitHub repository (owner/repo)")
     parser.add_argument("--workflow-id", default='qr-code-webhook.yml', help="Workflow file name")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                       help="Use the async HTTP/2 client (requires httpx)")
     
     args = parser.parse_args()
     
-    client = WebhookClient(
-        google_script_url=args.google_script_url,
-        github_token=args.github_token,
-        repository=args.repository
-    )
-    
     # Validate that either sheet_row or product_name is provided
-    if not args.sheet_row and not args.product_name:
-        print("❌ Error: Either --sheet-row or --product-name must be provided")
+    if not args.sheet_row and not args.product_name and not args.from_file:
+        print("❌ Error: Either --sheet-row, --product-name or --from-file must be provided")
         sys.exit(1)
     
+    if args.from_file:
+        with open(args.from_file) as f:
+            product_names = [line.strip() for line in f if line.strip()]
+    else:
+        product_names = [args.product_name]
+    # One timestamp for the whole run, shared by every product in a bulk trigger
+    timestamp = utc_timestamp()
+    
+    if args.use_async:
+        results = asyncio.run(run_method_async(args, product_names, timestamp))
+    else:
+        with WebhookClient(
+            google_script_url=args.google_script_url,
+            github_token=args.github_token,
+            repository=args.repository
+        ) as client:
+            results = [run_method(client, args, name, timestamp) for name in product_names]
+    result = results[0] if len(results) == 1 else results
+    
+    if all(results):
+        print("\n✅ Success!")
+        print(json.dumps(result, indent=2))
+    else:
+        print("\n❌ Failed!")
+        sys.exit(1)
+
+async def run_method_async(args, product_names, timestamp=None):
+    """Trigger QR code generation through AsyncWebhookClient for each product name"""
+    async with AsyncWebhookClient(
+        google_script_url=args.google_script_url,
+        github_token=args.github_token,
+        repository=args.repository
+    ) as client:
+        # AsyncWebhookClient methods return coroutines, so run_method's result is awaitable
+        return [await run_method(client, args, name, timestamp) for name in product_names]
+
+def run_method(client, args, product_name=None, timestamp=None):
+    """Trigger QR code generation with the method selected on the command line"""
+    product_name = product_name or args.product_name
     if args.method == 'google':
         # For Google method, we still need a product name
-        if not args.product_name:
+        if not product_name:
             print("❌ Error: --product-name is required for Google method")
             sys.exit(1)
-        result = client.call_google_app_script_webhook(args.product_name)
+        result = client.call_google_app_script_webhook(product_name)
     elif args.method == 'dispatch':
         result = client.trigger_repository_dispatch(
             sheet_row=args.sheet_row,
-            product_name=args.product_name,
+            product_name=product_name,
             landing_page_url=args.landing_page_url,
             farm_name=args.farm_name,
             state=args.state,
             country=args.country,
-            year=args.year
+            year=args.year,
+            timestamp=timestamp
         )
     elif args.method == 'workflow':
         # For workflow dispatch, we need a product name
-        if not args.product_name:
+        if not product_name:
             print("❌ Error: --product-name is required for workflow method")
             sys.exit(1)
-        result = client.trigger_workflow_dispatch(args.product_name, args.workflow_id)
+        result = client.trigger_workflow_dispatch(product_name, args.workflow_id)
     elif args.method == 'issue':
         # For issue method, we need a product name
-        if not args.product_name:
+        if not product_name:
             print("❌ Error: --product-name is required for issue method")
             sys.exit(1)
-        result = client.create_issue_with_webhook(args.product_name)
-    
-    if result:
-        print("\n✅ Success!")
-        print(json.dumps(result, indent=2))
-    else:
-        print("\n❌ Failed!")
-        sys.exit(1)
+        result = client.create_issue_with_webhook(product_name, timestamp=timestamp)
+    return result
 
 if __name__ == "__main__":
     import sys
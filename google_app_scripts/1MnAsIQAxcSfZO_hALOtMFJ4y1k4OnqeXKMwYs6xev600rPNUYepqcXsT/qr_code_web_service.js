@@ -838,6 +838,9 @@ function doGetQrGenerator_(e) {
           return createErrorResponse('Missing required parameter: product_name for search action');
         }
         return searchProduct(productName);
+      case 'batch':
+        // Several read-only actions in one round-trip, e.g. actions=list,search:2024
+        return runBatchActions_(e.parameter.actions || '');
       case 'generate':
         if (!productName) {
           return createErrorResponse('Missing required parameter: product_name for generate action');
@@ -853,7 +856,7 @@ function doGetQrGenerator_(e) {
         }
         return generateQRCode(productName);
       default:
-        return createErrorResponse('Invalid action. Use "list", "search", "generate", or "generate_single"');
+        return createErrorResponse('Invalid action. Use "list", "search", "batch", "generate", or "generate_single"');
     }
     
   } catch (error) {
@@ -1147,6 +1150,35 @@ function searchProduct(productName) {
   });
 }
 
+// ===== Batch Read Function =====
+/**
+ * Runs several read-only actions and returns all results in one response.
+ * @param {string} actionsParam Comma-separated specs: "list" or "search:<product_name>".
+ * @return {ContentService.TextOutput} { status, data: { action: 'batch', results: { spec: response } } }
+ */
+function runBatchActions_(actionsParam) {
+  var specs = String(actionsParam).split(',');
+  var results = {};
+  specs.forEach(function(spec) {
+    var sep = spec.indexOf(':');
+    var name = (sep === -1 ? spec : spec.substring(0, sep)).trim();
+    var arg = sep === -1 ? '' : spec.substring(sep + 1);
+    var output;
+    if (name === 'list') {
+      output = listAllCurrencies();
+    } else if (name === 'search') {
+      output = arg ? searchProduct(arg) : createErrorResponse('Missing required parameter: product_name for search action');
+    } else {
+      output = createErrorResponse('Unsupported batch action: ' + name);
+    }
+    results[spec] = JSON.parse(output.getContent());
+  });
+  return createSuccessResponse({
+    action: 'batch',
+    results: results
+  });
+}
+
 // ===== QR Code Generation Function =====
 function generateQRCode(productName) {
   var spreadsheet = SpreadsheetApp.openByUrl(QR_GEN_CURRENCIES_WORKBOOK_URL);
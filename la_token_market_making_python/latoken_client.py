@@ -3,32 +3,39 @@
 Client for interacting with the LATOKEN exchange REST API.
 """
 
+import copy
+import logging
 import os
 import time
 import json
 import hmac
 import hashlib
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Base URL for LATOKEN API
-"""
-Client for interacting with the LATOKEN exchange REST API.
-"""
+# Parse/serialize API payloads with orjson when available; the stdlib json module is the fallback
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
-"""
-Client for interacting with the LATOKEN exchange REST API.
-"""
-import os
-import requests
+    def json_dumps(obj) -> bytes:
+        """Compact UTF-8 JSON bytes, matching orjson.dumps output"""
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+logger = logging.getLogger(__name__)
 
-"""
-Client for interacting with the LATOKEN exchange REST API.
-"""
 # Base URL for LATOKEN API (default)
 DEFAULT_BASE_URL = os.getenv("LATOKEN_BASE_URL", "https://api.latoken.com")
 # Default asset IDs for TDG/USDT
 DEFAULT_CURRENCY_ID = os.getenv("LATOKEN_CURRENCY_ID", "cbfd4c19-259c-420b-9bb2-498493265648")
 DEFAULT_QUOTE_ID = os.getenv("LATOKEN_QUOTE_ID", "0c3a106d-bde3-4c13-a26e-3fd2394529e5")
+# Seconds an order book response is reused before refetching (0 disables caching)
+DEFAULT_BOOK_TTL = float(os.getenv("LATOKEN_BOOK_TTL", "2.0"))
+# (connect, read) timeout in seconds for every API request
+REQUEST_TIMEOUT = (3.05, 10)
 
 class LatokenClient:
     """Encapsulates LATOKEN API interactions via currency/quote IDs.
@@ -38,6 +45,9 @@ class LatokenClient:
           { 'http': 'socks5://127.0.0.1:1080', 'https': 'socks5://127.0.0.1:1080' }
       - `proxy`: a single proxy URL applied to both HTTP and HTTPS, e.g.
           'socks5://127.0.0.1:1080'
+
+    Order books are cached for `book_ttl` seconds (env `LATOKEN_BOOK_TTL`,
+    default 2.0) per (currency_id, quote_id, limit).
     """
 
     def __init__(
@@ -49,10 +59,16 @@ class LatokenClient:
         quote_id: str = None,
         proxies: dict = None,
         proxy: str = None,
+        book_ttl: float = None,
     ):
         # API credentials (private endpoints; public endpoints do not require auth)
         self.api_key = api_key or os.getenv("LATOKEN_API_KEY")
         self.api_secret = api_secret or os.getenv("LATOKEN_API_SECRET")
+        # HMAC-SHA512 keyed once with the secret; each signature works on a copy
+        self._signer = (
+            hmac.new(self.api_secret.encode('utf-8'), digestmod=hashlib.sha512)
+            if self.api_secret else None
+        )
         # Base URL for endpoints
         self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
         # Trading pair asset IDs (use defaults if not provided)
@@ -65,90 +81,123 @@ class LatokenClient:
             self.proxies = {'http': proxy, 'https': proxy}
         else:
             self.proxies = {}
-        # Create a requests Session to persist settings (e.g., proxies)
+        # Create a requests Session to persist settings (e.g., proxies) and keep
+        # connections to the API host alive between market-making ticks
         self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+        ))
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'User-Agent': 'la-token-mm/1.0',
+        })
+        if self.api_key:
+            self.session.headers['X-LA-APIKEY'] = self.api_key
         if self.proxies:
             self.session.proxies.update(self.proxies)
+        # Short-lived order book cache:
+        # (currency_id, quote_id, limit) -> (fetched_at, book, ask_prices, ask_quantities)
+        self.book_ttl = DEFAULT_BOOK_TTL if book_ttl is None else book_ttl
+        self._book_cache = {}
+        # Best ask from the most recent fetch: (price, quantity, fetched_at)
+        self._top_ask = None
 
     def get_book(self, limit: int = 50) -> dict:
         """
         Retrieve the order book for the configured trading pair IDs.
+
+        The raw 'bid'/'ask' keys are normalized to 'bids'/'asks'. Responses are
+        reused for `book_ttl` seconds; callers get a copy of the cached dict.
+        """
+        return copy.copy(self._cached_book(limit)[1])
+
+    def _cached_book(self, limit: int) -> tuple:
         """
+        Return the cache entry (fetched_at, book, ask_prices, ask_quantities) for `limit`,
+        fetching the book when the entry is missing or older than `book_ttl`.
+        """
+        key = (self.currency_id, self.quote_id, limit)
+        now = time.monotonic()
+        cached = self._book_cache.get(key)
+        if cached is not None and now - cached[0] < self.book_ttl:
+            return cached
         url = f"{self.base_url}/v2/book/{self.currency_id}/{self.quote_id}"
         params = {"limit": limit}
         # Use session (with proxies if configured)
-        response = self.session.get(url, params=params)
+        response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        book = json_loads(response.content)
+        # Normalize keys: use 'bids' and 'asks' for consistency
+        if isinstance(book, dict):
+            book['bids'] = book.pop('bid', None) or book.get('bids') or []
+            book['asks'] = book.pop('ask', None) or book.get('asks') or []
+        # Ask levels as float arrays, parsed once per fetch for calculate_purchase_amount
+        asks = (book.get('asks') or []) if isinstance(book, dict) else []
+        prices = np.fromiter((float(level.get('price', 0)) for level in asks), dtype=np.float64, count=len(asks))
+        quantities = np.fromiter((float(level.get('quantity', 0)) for level in asks), dtype=np.float64, count=len(asks))
+        if len(prices):
+            self._top_ask = (float(prices[0]), float(quantities[0]), now)
+        entry = (now, book, prices, quantities)
+        self._book_cache[key] = entry
+        return entry
     
-    def calculate_purchase_amount(self, budget: float, limit: int = 50) -> dict:
+    def calculate_purchase_amount(self, budget: float, limit: int = 50, include_breakdown: bool = True) -> dict:
         """
         Simulate purchasing base currency (TDG) with a USD budget based on the current order book asks.
 
         Args:
             budget: USD amount available for purchases.
             limit: depth limit for the order book (number of levels to fetch).
+            include_breakdown: also return the per-level fills as 'purchases'; pass False
+                to skip building them when only the totals are needed.
 
         Returns:
             A dict with:
               - total_quantity: float, total TDG units purchaseable with the budget.
               - total_cost: float, total USD spent (<= budget).
               - average_price: float, weighted average price (total_cost/total_quantity).
-              - purchases: list of dicts, each with keys:
+              - purchases (unless include_breakdown is False): NumPy record array with fields
                   'price': float price per TDG,
                   'quantity': float TDG bought at this price,
                   'cost': float USD spent at this level.
         """
-        # Ensure positive budget
-        remaining = float(budget)
-        if remaining <= 0:
-            return {
-                'total_quantity': 0.0,
-                'total_cost': 0.0,
-                'average_price': 0.0,
-                'purchases': [],
-            }
-        # Fetch current order book and normalize asks
-        book = self.get_book(limit=limit)
-        # support both 'ask' and 'asks' keys
-        asks = []
-        if isinstance(book, dict):
-            if 'asks' in book:
-                asks = book.get('asks') or []
-            elif 'ask' in book:
-                asks = book.get('ask') or []
-        purchases = []
+        empty = np.empty(0, dtype=np.float64)
+        # Ensure positive budget and a non-empty depth
         remaining = float(budget)
-        total_qty = 0.0
-        total_cost = 0.0
-        # Iterate through asks (ascending price)
-        for level in asks:
-            if remaining <= 0:
-                break
-            price = float(level.get('price', 0))
-            qty_available = float(level.get('quantity', 0))
-            # cost to buy full available quantity at this price
-            cost_full = price * qty_available
-            if cost_full <= remaining:
-                qty = qty_available
-                cost = cost_full
-            else:
-                # buy partial amount
-                qty = remaining / price if price > 0 else 0.0
-                cost = qty * price
-            if qty <= 0:
-                continue
-            purchases.append({'price': price, 'quantity': qty, 'cost': cost})
-            total_qty += qty
-            total_cost += cost
-            remaining -= cost
-        avg_price = (total_cost / total_qty) if total_qty > 0 else 0.0
-        return {
-            'total_quantity': total_qty,
-            'total_cost': total_cost,
-            'average_price': avg_price,
-            'purchases': purchases,
-        }
+        if remaining <= 0 or limit <= 0:
+            return _purchase_plan(empty, empty, empty, include_breakdown)
+        # A budget that fits inside a fresh best ask is filled there alone; no need
+        # to (re)fetch the deeper book
+        if self._top_ask is not None:
+            top_price, top_qty, fetched_at = self._top_ask
+            if (time.monotonic() - fetched_at < self.book_ttl
+                    and top_price > 0 and remaining <= top_price * top_qty):
+                qty = remaining / top_price
+                return _purchase_plan(
+                    np.array([top_price]), np.array([qty]), np.array([qty * top_price]), include_breakdown
+                )
+        # Fetch current order book asks (already normalized and parsed by the cache)
+        _, _, prices, quantities = self._cached_book(limit)
+        n = len(prices)
+        if n == 0:
+            return _purchase_plan(empty, empty, empty, include_breakdown)
+        # Asks are in ascending price order: every level whose cumulative cost fits
+        # the budget is bought in full, the next level is bought partially
+        costs = prices * quantities
+        cumulative = np.cumsum(costs)
+        full = int(np.searchsorted(cumulative, remaining, side='right'))
+        fill_prices = prices[:full]
+        fill_qty = quantities[:full]
+        fill_costs = costs[:full]
+        leftover = remaining - (cumulative[full - 1] if full else 0.0)
+        if full < n and leftover > 0 and prices[full] > 0:
+            partial_qty = leftover / prices[full]
+            fill_prices = np.append(fill_prices, prices[full])
+            fill_qty = np.append(fill_qty, partial_qty)
+            fill_costs = np.append(fill_costs, partial_qty * prices[full])
+        return _purchase_plan(fill_prices, fill_qty, fill_costs, include_breakdown)
     
     def print_purchase_plan(self, budget: float, limit: int = 50):
         """
@@ -166,11 +215,8 @@ class LatokenClient:
         print(f"Total cost (USD): {cost:.4f} USD")
         print(f"Average price (USD/TDG): {avg:.6f}")
         print("Purchase breakdown per ask level:")
-        for entry in result.get('purchases', []):
-            price = entry.get('price')
-            q = entry.get('quantity')
-            c = entry.get('cost')
-            print(f" - {q:.4f} TDG @ {price:.8f} USD = {c:.4f} USD")
+        for row in result['purchases']:
+            print(f" - {row.quantity:.4f} TDG @ {row.price:.8f} USD = {row.cost:.4f} USD")
     
     def place_order(
         self,
@@ -208,46 +254,54 @@ class LatokenClient:
             payload['price'] = str(price)
         if client_order_id:
             payload['clientOrderId'] = client_order_id
-        body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+        if self._signer is None:
+            raise RuntimeError("LATOKEN_API_SECRET must be provided via constructor or environment")
+        # Encode once: the same bytes are signed and sent
+        body = json_dumps(payload)
         # Sign the request
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            body.encode('utf-8'),
-            hashlib.sha512,
-        ).hexdigest()
+        signer = self._signer.copy()
+        signer.update(body)
+        signature = signer.hexdigest()
         headers = {
-            'X-LA-APIKEY': self.api_key,
             'X-LA-SIGNATURE': signature,
             'Content-Type': 'application/json',
         }
         # Send request using session (with proxies if configured)
         url = f"{self.base_url}/v2/order"
-        resp = self.session.post(url, headers=headers, data=body)
+        resp = self.session.post(url, headers=headers, data=body, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
-
-        print("\n\n\n==== Start: Request to place order API call =====")
-        print(payload)
-        print("\n==== Start: Response from place order API call =====")
-        print(resp)
-        print("==== End: Place order API calls =====\n\n\n")
+        logger.debug("place_order request: %s", payload)
+        logger.debug("place_order response: %s", resp)
         try:
-            return resp.json()
+            return json_loads(resp.content)
         except ValueError:
             return {'result': resp.text}
 
+def _purchase_plan(fill_prices, fill_qty, fill_costs, include_breakdown: bool) -> dict:
+    """
+    Build the calculate_purchase_amount result from per-level fill arrays.
+    """
+    # Levels with nothing to buy are not part of the plan
+    bought = fill_qty > 0
+    fill_prices, fill_qty, fill_costs = fill_prices[bought], fill_qty[bought], fill_costs[bought]
+    total_qty = float(fill_qty.sum())
+    total_cost = float(fill_costs.sum())
+    plan = {
+        'total_quantity': total_qty,
+        'total_cost': total_cost,
+        'average_price': (total_cost / total_qty) if total_qty > 0 else 0.0,
+    }
+    if include_breakdown:
+        plan['purchases'] = np.rec.fromarrays(
+            [fill_prices, fill_qty, fill_costs],
+            dtype=[('price', 'f8'), ('quantity', 'f8'), ('cost', 'f8')],
+        )
+    return plan
+
 def get_order_book(limit: int = 50) -> dict:
     """
     Convenience wrapper using environment-variable credentials for currency/quote IDs.
     """
     client = LatokenClient()
-    # Fetch raw order book (keys: 'bid', 'ask', etc.)
-    book = client.get_book(limit=limit)
-    # Normalize keys: use 'bids' and 'asks' for consistency
-    if isinstance(book, dict):
-        # Rename 'bid' -> 'bids'
-        if 'bid' in book:
-            book['bids'] = book.pop('bid') or []
-        # Rename 'ask' -> 'asks'
-        if 'ask' in book:
-            book['asks'] = book.pop('ask') or []
-    return book
\ No newline at end of file
+    # get_book already normalizes 'bid'/'ask' to 'bids'/'asks'
+    return client.get_book(limit=limit)
\ No newline at end of file
@@ -1,7 +1,9 @@
 import requests
+from requests.adapters import HTTPAdapter
 import datetime
 import hashlib
 import hmac
+from urllib.parse import urlencode
 
 import os
 from dotenv import load_dotenv
@@ -28,18 +30,21 @@ params = {
     'price': '0.001',
     'quantity': '5'
 }
-serializeFunc = map(lambda it : it[0] + '=' + str(it[1]), params.items())
-bodyParams = '&'.join(serializeFunc)
-                  
+bodyParams = urlencode(params)
+
 signature = hmac.new(
-    apiSecret, 
+    apiSecret.encode('ascii'),
     ('POST' + endpoint + bodyParams).encode('ascii'), 
     hashlib.sha512
 )
 
 url = baseUrl + endpoint
 
-response = requests.post(
+# Keep-alive session so repeated calls reuse the TLS connection to the API host
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+response = SESSION.post(
     url,
     headers = {
         'Content-Type': 'application/json',
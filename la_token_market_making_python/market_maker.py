@@ -6,8 +6,8 @@ This script implements a basic market making strategy for LA_TOKEN tokens.
 """
 
 import argparse
+import asyncio
 import logging
-import time
 import os
 import sys
 # Load environment variables from a .env file in this directory
@@ -61,9 +61,12 @@ class MarketMaker:
     def fetch_order_book(self, pair: str = "TDG_USDT", limit: int = 50):
         """
         Fetch the order book for a given trading pair from LATOKEN.
+
+        The pair itself is configured on the LatokenClient via currency/quote IDs;
+        get_book reuses the previous response within its TTL across cycles.
         """
         try:
-            book = self.latoken.get_order_book(pair=pair, limit=limit)
+            book = self.latoken.get_book(limit=limit)
             bids = book.get("bids", [])
             asks = book.get("asks", [])
             logging.info(
@@ -74,20 +77,22 @@ class MarketMaker:
             logging.error("Error fetching order book from LATOKEN: %s", e)
             return None
 
-    def run_cycle(self):
+    async def run_cycle(self):
         """
         Run a single market making cycle:
-        - Fetch order book
+        - Fetch daily budget and order book (concurrently)
         - Compute bid and ask prices
         - Place limit orders
         """
         logging.info("Running market making cycle")
-        # fetch the DAO-approved daily budget from WIX
-        budget = self.get_daily_budget()
+        # fetch the DAO-approved daily budget from WIX and the current order book
+        # from LATOKEN at the same time; both are blocking HTTP calls
+        budget, order_book = await asyncio.gather(
+            asyncio.to_thread(self.get_daily_budget),
+            asyncio.to_thread(self.fetch_order_book),
+        )
         if budget is not None:
             logging.info("Daily budget is %s", budget)
-        # fetch the current order book from LATOKEN
-        order_book = self.fetch_order_book()
         # TODO: Implement strategy steps using budget and order book data
         pass
 
@@ -123,17 +128,14 @@ class MarketMaker:
         logging.info("Order response: %s", response)
         return response
 
-    def start(self):
+    async def start(self):
         """Begin the continuous market making loop."""
         logging.info(
             "Starting LA_TOKEN market making bot with interval %s seconds", self.interval
         )
-        try:
-            while True:
-                self.run_cycle()
-                time.sleep(self.interval)
-        except KeyboardInterrupt:
-            logging.info("Market making bot stopped by user.")
+        while True:
+            await self.run_cycle()
+            await asyncio.sleep(self.interval)
 
 def main():
     args = parse_args()
@@ -142,7 +144,10 @@ def main():
         format="%(asctime)s %(levelname)s: %(message)s",
     )
     mm = MarketMaker(interval=args.interval)
-    mm.start()
+    try:
+        asyncio.run(mm.start())
+    except KeyboardInterrupt:
+        logging.info("Market making bot stopped by user.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
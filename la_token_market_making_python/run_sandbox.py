@@ -7,6 +7,7 @@ Simple sandbox script replicating LA_TOKEN_sandbox.ipynb steps:
   - Display top bids/asks
   - Compute TDG purchase plan based on budget
 """
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
@@ -18,21 +19,26 @@ sys.path.append(os.path.dirname(__file__))
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 
 from wix_client import get_daily_budget
-from latoken_client import LatokenClient, get_order_book
+from latoken_client import LatokenClient
 
 from market_maker import MarketMaker
-from latoken_client import get_order_book, LatokenClient
+
+async def fetch_budget_and_book(client, limit=50):
+    """Fetch the WIX daily budget and the LATOKEN order book concurrently (different hosts)."""
+    return await asyncio.gather(
+        asyncio.to_thread(get_daily_budget),
+        asyncio.to_thread(client.get_book, limit=limit),
+    )
 
 def main():
     # Show which WIX data item ID is configured
     print("WIX_DAILY_BUDGET_DATA_ITEM_ID =", os.getenv("WIX_DAILY_BUDGET_DATA_ITEM_ID"))
 
-    # Retrieve and display daily budget from WIX
-    budget = get_daily_budget()
+    # Retrieve the daily budget from WIX and the order book from LATOKEN (no proxy) in parallel;
+    # the book is fetched at the purchase-plan depth so the plan below reuses the cached copy
+    client = LatokenClient()  # uses env creds, no proxy
+    budget, book = asyncio.run(fetch_budget_and_book(client, limit=50))
     print("Daily budget from WIX:", budget)
-
-    # Fetch order book from LATOKEN (no proxy)
-    book = get_order_book(limit=10)
     bids = book.get('bids', [])[:5]
     asks = book.get('asks', [])[:5]
 
@@ -44,7 +50,6 @@ def main():
         print(ask)
 
     # Compute purchase plan for TDG based on budget
-    client = LatokenClient()  # uses env creds, no proxy
     plan = client.calculate_purchase_amount(budget, limit=50)
     qty = plan['total_quantity']
     cost = plan['total_cost']
@@ -54,11 +59,8 @@ def main():
     print(f"Total cost (USD): {cost:.4f} USD")
     print(f"Average price (USD/TDG): {avg:.6f}")
     print("Purchase breakdown per ask level:")
-    for entry in plan.get('purchases', []):
-        price = entry['price']
-        q = entry['quantity']
-        c = entry['cost']
-        print(f" - {q:.4f} TDG @ {price:.8f} USD = {c:.4f} USD")
+    for row in plan['purchases']:
+        print(f" - {row.quantity:.4f} TDG @ {row.price:.8f} USD = {row.cost:.4f} USD")
 
 
     purchase_price = '0.001'
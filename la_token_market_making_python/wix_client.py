@@ -2,12 +2,23 @@
 """
 Client for interacting with WIX Data APIs to retrieve stored values like the daily budget.
 """
+import functools
+import json
 import os
 import requests
+from requests.adapters import HTTPAdapter
+
+# Parse responses with orjson when available; the stdlib parser is the fallback
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 # Base configuration
 WIX_API_URL = "https://www.wixapis.com/wix-data/v2/items"
 DATA_COLLECTION_ID = "ExchangeRate"
+# (connect, read) timeout in seconds for Wix Data API calls
+REQUEST_TIMEOUT = (3.05, 10)
 
 class WixClient:
     """Encapsulates Wix Data API interactions."""
@@ -44,6 +55,11 @@ class WixClient:
             or "d45a189f-d0cc-48de-95ee-30635a95385f"
         )
 
+        # Keep-alive session so repeated budget lookups reuse the TLS connection
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self.session.headers.update(self.get_request_headers())
+
     def get_request_headers(self) -> dict:
         """Return headers for Wix Data API requests."""
         return {
@@ -59,12 +75,17 @@ class WixClient:
             f"{WIX_API_URL}/{self.daily_budget_item_id}"
             f"?dataCollectionId={DATA_COLLECTION_ID}"
         )
-        response = requests.get(url, headers=self.get_request_headers())
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
+        data = json_loads(response.content)
         return data["dataItem"]["data"]["exchangeRate"]
 
+@functools.lru_cache(maxsize=1)
+def _default_client() -> WixClient:
+    # One environment-configured client per process, so its session's
+    # connection is reused across get_daily_budget() calls
+    return WixClient()
+
 def get_daily_budget():
     """Retrieve the current daily budget using environment variables."""
-    client = WixClient()
-    return client.get_daily_budget()
\ No newline at end of file
+    return _default_client().get_daily_budget()
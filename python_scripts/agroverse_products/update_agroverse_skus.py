@@ -7,10 +7,13 @@ the Google Sheet directly using the Google Sheets API.
 """
 
 import json
-import re
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
+import json5
 import gspread
+import pandas as pd
+from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
 
 # Configuration
@@ -23,6 +26,64 @@ PRODUCTS_JS_FILE = Path('/Users/garyjob/Applications/agroverse_shop/js/products.
 # Path to service account JSON (adjust if needed)
 SERVICE_ACCOUNT_FILE = Path('/Users/garyjob/Applications/agroverse_shop/google-service-account.json')
 
+SCOPES = ['https://spreadsheets.google.com/feeds',
+          'https://www.googleapis.com/auth/drive']
+
+# Refresh the access token this long before it expires
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Prefix for relative product image paths
+IMAGE_URL_PREFIX = 'https://www.agroverse.shop'
+
+# Product fields in sheet column order (A-H)
+PRODUCT_COLUMNS = ['productId', 'name', 'price', 'weight', 'category', 'shipment', 'farm', 'image']
+
+# Service account credentials and gspread client, reused across calls in this process
+_CREDS = None
+_CLIENT = None
+
+def find_object_literal(content, marker):
+    """
+    Return the source of the `{ ... }` object literal assigned after `marker`, or None
+
+    Scans once with a brace depth counter, skipping braces inside strings and comments.
+    """
+    idx = content.find(marker)
+    if idx == -1:
+        return None
+    start = content.find('{', idx)
+    if start == -1:
+        return None
+    
+    depth = 0
+    quote = None
+    i = start
+    n = len(content)
+    while i < n:
+        ch = content[i]
+        if quote:
+            if ch == '\\':
+                i += 1  # skip the escaped character
+            elif ch == quote:
+                quote = None
+        elif ch in ('"', "'", '`'):
+            quote = ch
+        elif content.startswith('//', i):
+            newline = content.find('\n', i)
+            i = n if newline == -1 else newline
+        elif content.startswith('/*', i):
+            end_comment = content.find('*/', i + 2)
+            i = n if end_comment == -1 else end_comment + 1
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return content[start:i + 1]
+        i += 1
+    return None
+
+
 def parse_products_js(products_js_path):
     """
     Parse products.js file and extract product data
@@ -36,50 +97,37 @@ def parse_products_js(products_js_path):
     with open(products_js_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # Extract the PRODUCTS object using regex
-    # Look for window.PRODUCTS = { ... };
-    pattern = r'window\.PRODUCTS\s*=\s*({[^}]+(?:{[^}]*}[^}]*)*});'
-    match = re.search(pattern, content, re.DOTALL)
+    # Extract the PRODUCTS object: window.PRODUCTS = { ... };
+    products_str = find_object_literal(content, 'window.PRODUCTS')
     
-    if not match:
+    if not products_str:
         print("Error: Could not find window.PRODUCTS object in products.js")
         return products
     
-    products_str = match.group(1)
-    
-    # Parse the JavaScript object (this is a simplified parser)
-    # Extract individual product entries
-    product_pattern = r"['\"]([^'\"]+)['\"]:\s*{([^}]+(?:{[^}]*}[^}]*)*)}"
+    # The object is a JavaScript literal (unquoted keys, single quotes, trailing commas),
+    # which json5 parses directly
+    try:
+        raw_products = json5.loads(products_str)
+    except ValueError as e:
+        print(f"Error: Could not parse window.PRODUCTS object in products.js: {e}")
+        return products
     
-    for product_match in re.finditer(product_pattern, products_str, re.DOTALL):
-        product_id = product_match.group(1)
-        product_body = product_match.group(2)
+    for product_id, fields in raw_products.items():
+        if not isinstance(fields, dict):
+            continue
         
         product_data = {}
-        
-        # Extract fields
-        field_patterns = {
-            'productId': r"productId:\s*['\"]([^'\"]+)['\"]",
-            'name': r"name:\s*['\"]([^'\"]+)['\"]",
-            'price': r"price:\s*([0-9.]+)",
-            'weight': r"weight:\s*([0-9.]+)",
-            'image': r"image:\s*['\"]([^'\"]+)['\"]",
-            'category': r"category:\s*['\"]([^'\"]+)['\"]",
-            'shipment': r"shipment:\s*['\"]([^'\"]+)['\"]",
-            'farm': r"farm:\s*['\"]([^'\"]+)['\"]"
-        }
-        
-        for field, pattern in field_patterns.items():
-            field_match = re.search(pattern, product_body)
-            if field_match:
-                value = field_match.group(1)
-                if field in ['price', 'weight']:
-                    try:
-                        product_data[field] = float(value)
-                    except ValueError:
-                        product_data[field] = 0 if field == 'price' else ''
-                else:
-                    product_data[field] = value
+        for field in ('productId', 'name', 'price', 'weight', 'image', 'category', 'shipment', 'farm'):
+            value = fields.get(field)
+            if value is None:
+                continue
+            if field in ('price', 'weight'):
+                try:
+                    product_data[field] = float(value)
+                except (TypeError, ValueError):
+                    product_data[field] = 0 if field == 'price' else ''
+            else:
+                product_data[field] = str(value)
         
         # Set defaults
         product_data.setdefault('productId', product_id)
@@ -191,6 +239,21 @@ def get_products_data():
     return products
 
 
+def get_gspread_client():
+    """
+    Return the cached gspread client, authorizing on first use and refreshing the
+    token shortly before it expires
+    """
+    global _CREDS, _CLIENT
+    if _CREDS is None:
+        _CREDS = Credentials.from_service_account_file(str(SERVICE_ACCOUNT_FILE), scopes=SCOPES)
+    elif _CREDS.expiry and _CREDS.expiry - datetime.utcnow() < TOKEN_REFRESH_MARGIN:
+        _CREDS.refresh(Request())
+    if _CLIENT is None:
+        _CLIENT = gspread.authorize(_CREDS)
+    return _CLIENT
+
+
 def update_google_sheet():
     """
     Update the Google Sheet with product data
@@ -205,10 +268,7 @@ def update_google_sheet():
             print("Please provide the path to your Google service account JSON file")
             return False
         
-        scope = ['https://spreadsheets.google.com/feeds',
-                 'https://www.googleapis.com/auth/drive']
-        creds = Credentials.from_service_account_file(str(SERVICE_ACCOUNT_FILE), scopes=scope)
-        client = gspread.authorize(creds)
+        client = get_gspread_client()
         
         # Open spreadsheet
         spreadsheet = client.open_by_key(SPREADSHEET_ID)
@@ -237,52 +297,66 @@ def update_google_sheet():
             'Image Path'
         ]
         
-        # Prepare data rows
-        rows = [headers]
+        # Prepare data rows: one column per sheet column, built once for all products
+        df = pd.DataFrame.from_dict(products, orient='index').reindex(columns=PRODUCT_COLUMNS)
+        df['productId'] = df['productId'].fillna(pd.Series(df.index, index=df.index))
+        df = df.fillna({'price': 0}).fillna('')
+        # Build full image URL for relative image paths
+        image = df['image'].astype(str)
+        df['image'] = image.where((image == '') | image.str.startswith('http'), IMAGE_URL_PREFIX + image)
+        rows = [headers] + df.values.tolist()
         
-        for product_id, product in products.items():
-            # Build full image URL
-            image_path = product.get('image', '')
-            if image_path and not image_path.startswith('http'):
-                image_url = f"https://www.agroverse.shop{image_path}"
-            else:
-                image_url = image_path
-            
-            row = [
-                product.get('productId', product_id),
-                product.get('name', ''),
-                product.get('price', 0),
-                product.get('weight', ''),
-                product.get('category', ''),
-                product.get('shipment', ''),
-                product.get('farm', ''),
-                image_url
-            ]
-            rows.append(row)
-        
-        # Clear existing content
-        worksheet.clear()
-        
-        # Update sheet with new data
-        worksheet.update(rows, value_input_option='USER_ENTERED')
-        
-        # Format price column as currency
-        price_col_letter = 'C'  # Column C
-        price_range = f"{price_col_letter}2:{price_col_letter}{len(rows)}"
-        worksheet.format(price_range, {
-            'numberFormat': {
-                'type': 'CURRENCY',
-                'pattern': '$#,##0.00'
-            }
+        # Write all values in one request (overwrites the old rows in place)
+        last_col_letter = chr(64 + len(headers))
+        spreadsheet.values_batch_update({
+            'valueInputOption': 'USER_ENTERED',
+            'data': [{
+                'range': f"'{SHEET_NAME}'!A1:{last_col_letter}{len(rows)}",
+                'values': rows
+            }]
         })
         
-        # Format header row
-        header_range = f"A1:{chr(64 + len(headers))}1"
-        worksheet.format(header_range, {
-            'textFormat': {
-                'bold': True
+        # Format and clear leftovers in one request
+        sheet_id = worksheet.id
+        price_col = 2  # Column C (0-based)
+        sheet_requests = [
+            # Format price column as currency
+            {
+                'repeatCell': {
+                    'range': {'sheetId': sheet_id, 'startRowIndex': 1, 'endRowIndex': len(rows),
+                              'startColumnIndex': price_col, 'endColumnIndex': price_col + 1},
+                    'cell': {'userEnteredFormat': {'numberFormat': {'type': 'CURRENCY', 'pattern': '$#,##0.00'}}},
+                    'fields': 'userEnteredFormat.numberFormat'
+                }
+            },
+            # Format header row
+            {
+                'repeatCell': {
+                    'range': {'sheetId': sheet_id, 'startRowIndex': 0, 'endRowIndex': 1,
+                              'startColumnIndex': 0, 'endColumnIndex': len(headers)},
+                    'cell': {'userEnteredFormat': {'textFormat': {'bold': True}}},
+                    'fields': 'userEnteredFormat.textFormat.bold'
+                }
             }
-        })
+        ]
+        # Clear values left over from a previous, larger run (replaces worksheet.clear());
+        # the grid size is already known from the worksheet metadata
+        if worksheet.row_count > len(rows):
+            sheet_requests.append({
+                'updateCells': {
+                    'range': {'sheetId': sheet_id, 'startRowIndex': len(rows), 'endRowIndex': worksheet.row_count},
+                    'fields': 'userEnteredValue'
+                }
+            })
+        if worksheet.col_count > len(headers):
+            sheet_requests.append({
+                'updateCells': {
+                    'range': {'sheetId': sheet_id, 'startRowIndex': 0, 'endRowIndex': len(rows),
+                              'startColumnIndex': len(headers), 'endColumnIndex': worksheet.col_count},
+                    'fields': 'userEnteredValue'
+                }
+            })
+        spreadsheet.batch_update({'requests': sheet_requests})
         
         # Auto-resize columns (this requires the API, so we'll skip it or do it manually)
         print(f"✅ Successfully updated {len(products)} products to {SHEET_NAME} sheet")
@@ -13,6 +13,7 @@ Usage:
     python gdrive.py [--credentials CREDENTIALS_FILE] [--sheet-url SHEET_URL] [--sheet-name SHEET_NAME]
 """
 import argparse
+import functools
 import os
 import re
 import sys
@@ -43,14 +44,16 @@ class GDrive:
                                  If not provided, application default credentials will be used.
         """
         # Determine credentials file (defaults to DEFAULT_CREDENTIALS_FILE)
-        credentials_file = credentials_path or DEFAULT_CREDENTIALS_FILE
-        if credentials_file and os.path.exists(credentials_file):
-            self.creds = service_account.Credentials.from_service_account_file(
-                credentials_file, scopes=self.SCOPES
-            )
-        else:
-            creds, _ = google.auth.default(scopes=self.SCOPES)
-            self.creds = creds
+        self.credentials_file = credentials_path or DEFAULT_CREDENTIALS_FILE
+        self.creds = _load_credentials(self.credentials_file)
+
+    @property
+    def sheets(self):
+        """
+        Spreadsheets resource of the Sheets v4 service, shared by every client
+        using the same credentials file.
+        """
+        return _sheets_resource(self.credentials_file)
 
     def list_qr_check_urls(self, sheet_url: str, sheet_name: str) -> list:
         """
@@ -62,18 +65,21 @@ class GDrive:
         :return: List of constructed QR check URLs.
         """
         sheet_id = self._extract_sheet_id(sheet_url)
-        service = build('sheets', 'v4', credentials=self.creds)
-        # Range A2 to end of column A
+        # Range A2 to end of column A; raw values skip server-side number/date formatting
         range_name = f"'{sheet_name}'!A2:A"
-        sheet = service.spreadsheets()
-        result = sheet.values().get(spreadsheetId=sheet_id, range=range_name).execute()
+        result = self.sheets.values().get(
+            spreadsheetId=sheet_id,
+            range=range_name,
+            valueRenderOption='UNFORMATTED_VALUE',
+        ).execute()
         values = result.get('values', [])
 
         base_url = BASE_QR_CHECK_URL
         urls = []
         for row in values:
             if row:
-                qr_code = row[0].strip()
+                # Unformatted numeric cells come back as numbers
+                qr_code = str(row[0]).strip()
                 if qr_code:
                     url = base_url + qr_code
                     urls.append(url)
@@ -93,7 +99,31 @@ class GDrive:
         if not match:
             raise ValueError(f"Could not parse spreadsheet ID from URL: {sheet_url}")
         return match.group(1)
-        
+
+
+@functools.lru_cache(maxsize=None)
+def _load_credentials(credentials_file: str):
+    """
+    Load service account credentials from the key file if it exists, otherwise
+    application default credentials. Parsed once per file per process.
+    """
+    if credentials_file and os.path.exists(credentials_file):
+        return service_account.Credentials.from_service_account_file(
+            credentials_file, scopes=GDrive.SCOPES
+        )
+    creds, _ = google.auth.default(scopes=GDrive.SCOPES)
+    return creds
+
+
+@functools.lru_cache(maxsize=None)
+def _sheets_resource(credentials_file: str):
+    """
+    Build the Sheets v4 spreadsheets resource once per credentials file, from the
+    discovery document bundled with google-api-python-client (no network fetch).
+    """
+    service = build('sheets', 'v4', credentials=_load_credentials(credentials_file), static_discovery=True)
+    return service.spreadsheets()
+
 def main():
     parser = argparse.ArgumentParser(
         description='Fetch QR codes from a Google Sheet and print check URLs'
@@ -3,6 +3,8 @@
 Client for interacting with the LATOKEN exchange REST API.
 """
 
+import copy
+import logging
 import os
 import time
 import json
@@ -10,25 +12,15 @@ import hmac
 import hashlib
 import requests
 
-# Base URL for LATOKEN API
-"""
-Client for interacting with the LATOKEN exchange REST API.
-"""
-
-"""
-Client for interacting with the LATOKEN exchange REST API.
-"""
-import os
-import requests
+logger = logging.getLogger(__name__)
 
-"""
-Client for interacting with the LATOKEN exchange REST API.
-"""
 # Base URL for LATOKEN API (default)
 DEFAULT_BASE_URL = os.getenv("LATOKEN_BASE_URL", "https://api.latoken.com")
 # Default asset IDs for TDG/USDT
 DEFAULT_CURRENCY_ID = os.getenv("LATOKEN_CURRENCY_ID", "cbfd4c19-259c-420b-9bb2-498493265648")
 DEFAULT_QUOTE_ID = os.getenv("LATOKEN_QUOTE_ID", "0c3a106d-bde3-4c13-a26e-3fd2394529e5")
+# Seconds an order book response is reused before refetching (0 disables caching)
+DEFAULT_BOOK_TTL = float(os.getenv("LATOKEN_BOOK_TTL", "2.0"))
 
 class LatokenClient:
     """Encapsulates LATOKEN API interactions via currency/quote IDs.
@@ -38,6 +30,9 @@ class LatokenClient:
           { 'http': 'socks5://127.0.0.1:1080', 'https': 'socks5://127.0.0.1:1080' }
       - `proxy`: a single proxy URL applied to both HTTP and HTTPS, e.g.
           'socks5://127.0.0.1:1080'
+
+    Order books are cached for `book_ttl` seconds (env `LATOKEN_BOOK_TTL`,
+    default 2.0) per (currency_id, quote_id, limit).
     """
 
     def __init__(
@@ -49,6 +44,7 @@ class LatokenClient:
         quote_id: str = None,
         proxies: dict = None,
         proxy: str = None,
+        book_ttl: float = None,
     ):
         # API credentials (private endpoints; public endpoints do not require auth)
         self.api_key = api_key or os.getenv("LATOKEN_API_KEY")
@@ -69,17 +65,33 @@ class LatokenClient:
         self.session = requests.Session()
         if self.proxies:
             self.session.proxies.update(self.proxies)
+        # Short-lived order book cache: (currency_id, quote_id, limit) -> (fetched_at, book)
+        self.book_ttl = DEFAULT_BOOK_TTL if book_ttl is None else book_ttl
+        self._book_cache = {}
 
     def get_book(self, limit: int = 50) -> dict:
         """
         Retrieve the order book for the configured trading pair IDs.
+
+        The raw 'bid'/'ask' keys are normalized to 'bids'/'asks'. Responses are reused for `book_ttl` seconds; callers get a copy of the cached dict.
         """
+        key = (self.currency_id, self.quote_id, limit)
+        now = time.monotonic()
+        cached = self._book_cache.get(key)
+        if cached is not None and now - cached[0] < self.book_ttl:
+            return copy.copy(cached[1])
         url = f"{self.base_url}/v2/book/{self.currency_id}/{self.quote_id}"
         params = {"limit": limit}
         # Use session (with proxies if configured)
         response = self.session.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        book = response.json()
+        # Normalize keys: use 'bids' and 'asks' for consistency
+        if isinstance(book, dict):
+            book['bids'] = book.pop('bid', None) or book.get('bids') or []
+            book['asks'] = book.pop('ask', None) or book.get('asks') or []
+        self._book_cache[key] = (now, book)
+        return copy.copy(book)
     
     def calculate_purchase_amount(self, budget: float, limit: int = 50) -> dict:
         """
@@ -108,16 +120,13 @@ class LatokenClient:
                 'average_price': 0.0,
                 'purchases': [],
             }
-        # Fetch current order book and normalize asks
+        # Fetch current order book (get_book already normalized 'ask' to 'asks')
         book = self.get_book(limit=limit)
-        # support both 'ask' and 'asks' keys
-        asks = []
-        if isinstance(book, dict):
-            if 'asks' in book:
-                asks = book.get('asks') or []
-            elif 'ask' in book:
-                asks = book.get('ask') or []
+        asks = book.get('asks', []) if isinstance(book, dict) else []
         purchases = []
+        # Bind hot lookups to locals once instead of per ask level
+        purchases_append = purchases.append
+        get = dict.get
         remaining = float(budget)
         total_qty = 0.0
         total_cost = 0.0
@@ -125,20 +134,22 @@ class LatokenClient:
         for level in asks:
             if remaining <= 0:
                 break
-            price = float(level.get('price', 0))
-            qty_available = float(level.get('quantity', 0))
-            # cost to buy full available quantity at this price
+            price = get(level, 'price', 0)
+            qty_available = get(level, 'quantity', 0)
+            # LATOKEN sends numeric strings; skip float() when already parsed as numbers
+            if not isinstance(price, float):
+                price = float(price or 0)
+            if not isinstance(qty_available, float):
+                qty_available = float(qty_available or 0)
+            # cost to buy full available quantity at this price, otherwise a partial amount
+            # (a partial fill implies price * qty_available > remaining > 0, so price > 0)
             cost_full = price * qty_available
-            if cost_full <= remaining:
-                qty = qty_available
-                cost = cost_full
-            else:
-                # buy partial amount
-                qty = remaining / price if price > 0 else 0.0
-                cost = qty * price
+            full = cost_full <= remaining
+            qty = qty_available if full else remaining / price
             if qty <= 0:
                 continue
-            purchases.append({'price': price, 'quantity': qty, 'cost': cost})
+            cost = cost_full if full else qty * price
+            purchases_append({'price': price, 'quantity': qty, 'cost': cost})
             total_qty += qty
             total_cost += cost
             remaining -= cost
@@ -224,8 +235,7 @@ class LatokenClient:
         url = f"{self.base_url}/v2/order"
         resp = self.session.post(url, headers=headers, data=body)
         resp.raise_for_status()
-        print("Line 227")
-        print(resp.json())
+        logger.debug("place_order response: %s", resp.text)
         try:
             return resp.json()
         except ValueError:
@@ -236,14 +246,5 @@ def get_order_book(limit: int = 50) -> dict:
     Convenience wrapper using environment-variable credentials for currency/quote IDs.
     """
     client = LatokenClient()
-    # Fetch raw order book (keys: 'bid', 'ask', etc.)
-    book = client.get_book(limit=limit)
-    # Normalize keys: use 'bids' and 'asks' for consistency
-    if isinstance(book, dict):
-        # Rename 'bid' -> 'bids'
-        if 'bid' in book:
-            book['bids'] = book.pop('bid') or []
-        # Rename 'ask' -> 'asks'
-        if 'ask' in book:
-            book['asks'] = book.pop('ask') or []
-    return book
\ No newline at end of file
+    # get_book already normalizes 'bid'/'ask' to 'bids'/'asks'
+    return client.get_book(limit=limit)
\ No newline at end of file
@@ -20,18 +20,65 @@ Install dependencies:
     pip install python-dotenv solana
 """
 
+import asyncio
+import atexit
+import functools
 import os
 import sys
-import json
-import urllib.request
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 
 from dotenv import load_dotenv
-from solana.rpc.api import Client
 from raydium.cpmm import buy as cpmm_buy
 from raydium.amm_v4 import buy as v4_buy
 from utils.pool_utils import fetch_amm_v4_pool_keys
 
+# (connect, read) timeout in seconds for Wix and Raydium REST calls
+HTTP_TIMEOUT = (3, 10)
+
+# One pooled session for all REST calls so repeated requests to the same host
+# reuse the open TLS connection instead of handshaking again
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+_SESSION.headers.update({
+    "Content-Type": "application/json",
+    "User-Agent": "tdg-buyback/1.0",
+})
+atexit.register(_SESSION.close)
+
+# Seconds a Wix budget / Raydium price lookup is reused within one process (0 disables caching)
+CACHE_TTL = float(os.getenv("BUYBACK_CACHE_TTL", "60"))
+
+def ttl_cache(seconds: float):
+    """
+    Reuse a function's result for `seconds` per argument tuple (floats rounded to 6 places).
+
+    Failed calls (exceptions or None results) are not cached.
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = tuple(round(a, 6) if isinstance(a, float) else a for a in args)
+            now = time.monotonic()
+            with lock:
+                cached = cache.get(key)
+                if cached is not None and now - cached[0] < seconds:
+                    return cached[1]
+            result = func(*args)
+            if result is not None:
+                with lock:
+                    cache[key] = (now, result)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
 # from solana.keypair import Keypair
 # from solana.publickey import PublicKey
 
@@ -44,10 +91,15 @@ from utils.pool_utils import fetch_amm_v4_pool_keys
 #     secret_key = bytes(data)
 #     return Keypair.from_secret_key(secret_key)
 
-def buyback():
-    budget = get_wix_daily_tdg_buyback_budget()
-    sol_to_use = check_usdc_to_sol(budget)
+async def fetch_buyback_inputs(pair_address: str):
+    """Fetch the Wix budget, Raydium SOL price and V4 pool keys concurrently (different hosts)."""
+    return await asyncio.gather(
+        asyncio.to_thread(get_wix_daily_tdg_buyback_budget),
+        asyncio.to_thread(get_sol_price),
+        asyncio.to_thread(fetch_amm_v4_pool_keys, pair_address),
+    )
 
+def buyback():
     pair_address = os.getenv("POOL_ID")
     if not pair_address:
         print("Missing POOL_ID environment variable")
@@ -55,8 +107,11 @@ def buyback():
 
     slippage = int(os.getenv("SLIPPAGE", "5"))
 
+    # The three lookups are independent, so run them concurrently
+    budget, sol_price, pool_v4 = asyncio.run(fetch_buyback_inputs(pair_address))
+    sol_to_use = usdc_to_sol(budget, sol_price)
+
     # Try CLMM (V4) first; if not found, fall back to CPMM
-    pool_v4 = fetch_amm_v4_pool_keys(pair_address)
     print("Line 60")
     print(pool_v4)
     if pool_v4 is not None:
@@ -74,6 +129,7 @@ def buyback():
     return success
     
 
+@ttl_cache(CACHE_TTL)
 def get_wix_daily_tdg_buyback_budget() -> float:
     """
     Fetch the daily TDG buy-back budget (in USDC) from Wix Data API.
@@ -101,15 +157,13 @@ def get_wix_daily_tdg_buyback_budget() -> float:
     
     headers = {
         "Authorization": api_key,
-        "Content-Type": "application/json",
         "wix-site-id": site_id,
         "wix-account-id": account_id,
     }
 
-    req = urllib.request.Request(url, headers=headers, method="GET")
-    with urllib.request.urlopen(req) as resp:
-        body = resp.read()
-    data = json.loads(body)
+    resp = _SESSION.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
     try:
         budget = data["dataItem"]["data"]["exchangeRate"]
     except KeyError:
@@ -117,36 +171,44 @@ def get_wix_daily_tdg_buyback_budget() -> float:
     print(f"Daily TDG Buy Back Budget on Wix: {budget}")
     return float(budget)
 
-def check_usdc_to_sol(usdc_amount: float) -> float:
+@ttl_cache(CACHE_TTL)
+def get_sol_price() -> float:
     """
-    Check estimated SOL output for a given USDC input by querying Raydium V3 REST API.
+    Fetch the SOL price in USD from the Raydium V3 REST API (None on failure).
     """
-    import os, json, urllib.request, urllib.parse
-
-    # Constants
-    USDC_MINT = os.getenv("USDC_MINT")
-    WSOL_MINT = "So11111111111111111111111111111111111111112"
     url = "https://api-v3.raydium.io/mint/price"
     params = {
         "mints": "So11111111111111111111111111111111111111112"
     }
 
-    response = requests.get(url, params=params)
+    response = _SESSION.get(url, params=params, timeout=HTTP_TIMEOUT)
 
     # Check if the request was successful
     if response.status_code == 200:
         data = response.json()
         if data.get("success"):
-            sol_price = data["data"]["So11111111111111111111111111111111111111112"]
-            amount_of_sol = usdc_amount / float(sol_price)
-            print(f"To purchase {amount_of_sol} SOL for buyback")
-            return amount_of_sol
-
+            return float(data["data"]["So11111111111111111111111111111111111111112"])
         else:
             print("Error:", data.get("error"))
     else:
         print(f"Failed to fetch data. Status code: {response.status_code}")
-    
+
+@ttl_cache(CACHE_TTL)
+def check_usdc_to_sol(usdc_amount: float) -> float:
+    """
+    Check estimated SOL output for a given USDC input by querying Raydium V3 REST API.
+    """
+    return usdc_to_sol(usdc_amount, get_sol_price())
+
+def usdc_to_sol(usdc_amount: float, sol_price: float) -> float:
+    """
+    Convert a USDC amount to SOL at the given price (None if the price is unavailable).
+    """
+    if sol_price is None:
+        return None
+    amount_of_sol = usdc_amount / sol_price
+    print(f"To purchase {amount_of_sol} SOL for buyback")
+    return amount_of_sol
     
 import argparse
 import sys